@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, post_save
 
 
 class BattlesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "battles"
+
+    def ready(self):
+        from .models import BattleComment, BattleLike, BattleShare, Vote
+        from .signals import (
+            install_search_vector_trigger,
+            install_vote_count_trigger,
+            record_voter_activity,
+            schedule_battle_score_on_create,
+        )
+
+        post_migrate.connect(install_vote_count_trigger, sender=self)
+        post_migrate.connect(install_search_vector_trigger, sender=self)
+        for model in (BattleLike, BattleShare, BattleComment):
+            post_save.connect(schedule_battle_score_on_create, sender=model)
+        post_save.connect(record_voter_activity, sender=Vote)
@@ -1,13 +1,21 @@
 """
 Battle models for VoteFight application.
 """
-from django.db import models
+import secrets
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 
+from utils.helpers import cache_redis_client, subquery_count
 from utils.models import BaseModel, TimestampedModel
 from .choices import BattleStatusChoices, CategoryChoices
+from .vote import Vote
 
 User = get_user_model()
 
@@ -46,11 +54,7 @@ class Battle(TimestampedModel):
     total_votes = models.PositiveIntegerField(default=0)
     
     # Trending algorithm
-    trending_score = models.DecimalField(
-        max_digits=5,
-        decimal_places=3,
-        default=0.0
-    )
+    trending_score = models.FloatField(default=0.0)
     vote_velocity = models.PositiveIntegerField(default=0)  # Votes per hour
     engagement_score = models.PositiveIntegerField(default=0)
     
@@ -63,6 +67,29 @@ class Battle(TimestampedModel):
     is_featured = models.BooleanField(default=False)
     is_moderated = models.BooleanField(default=False)
     
+    # Full-text search document, maintained by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    SLUG_MAX_ATTEMPTS = 3
+    
+    # Redis set of battle IDs with views not yet flushed to the database
+    VIEWS_DIRTY_KEY = 'views:dirty'
+    
+    # engagement_score weight of each denormalized counter; the single
+    # definition used by every path that writes engagement_score
+    ENGAGEMENT_WEIGHTS = {
+        'likes_count': 2,
+        'shares_count': 3,
+        'comments_count': 1,
+    }
+    
+    # Language-neutral config: battles are written in uz, ru and en; the
+    # battle_search_vector_trg trigger builds search_vector with it
+    SEARCH_CONFIG = 'simple'
+    
+    # Field values buffered by flush_pending_updates()
+    _pending_updates = None
+    
     class Meta:
         db_table = 'battles_battle'
         verbose_name = 'Battle'
@@ -73,6 +100,19 @@ class Battle(TimestampedModel):
             models.Index(fields=['trending_score']),
             models.Index(fields=['category', 'status']),
             models.Index(fields=['created_at']),
+            GinIndex(fields=['search_vector']),
+            # Partial covering index for the trending query: rows come
+            # back pre-ordered without touching the heap
+            models.Index(
+                fields=['-trending_score'],
+                name='trend_active_idx',
+                condition=models.Q(
+                    is_active=True,
+                    is_public=True,
+                    status=BattleStatusChoices.ACTIVE
+                ),
+                include=['id', 'title', 'slug', 'category', 'creator'],
+            ),
         ]
     
     def __str__(self):
@@ -92,7 +132,16 @@ class Battle(TimestampedModel):
     
     def save(self, *args, **kwargs):
         """Override save to handle slug generation and status updates."""
-        if not self.slug:
+        update_fields = kwargs.get('update_fields')
+        
+        # Inside flush_pending_updates() partial saves are only recorded
+        if self._pending_updates is not None and update_fields is not None:
+            for field in update_fields:
+                self._pending_updates[field] = getattr(self, field)
+            return
+        
+        slug_generated = not self.slug
+        if slug_generated:
             self.slug = self.generate_slug()
         
         # Update status based on deadline
@@ -100,20 +149,55 @@ class Battle(TimestampedModel):
             self.status = BattleStatusChoices.EXPIRED
             self.is_active = False
         
-        super().save(*args, **kwargs)
+        if slug_generated:
+            self._save_with_unique_slug(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+    
+    @contextmanager
+    def flush_pending_updates(self):
+        """
+        Coalesce save(update_fields=...) calls into a single UPDATE.
+        
+        Saves inside the block only record the listed field values; one
+        UPDATE writes them all on exit. Nothing is written if the block
+        raises.
+        """
+        self._pending_updates = {}
+        try:
+            yield self
+        except BaseException:
+            self._pending_updates = None
+            raise
+        
+        pending, self._pending_updates = self._pending_updates, None
+        if pending:
+            Battle.objects.filter(pk=self.pk).update(**pending)
+    
+    def _save_with_unique_slug(self, *args, **kwargs):
+        """
+        Save, letting the unique constraint arbitrate slug collisions.
+        On a collision the slug gets a random suffix and the save is retried.
+        """
+        for attempt in range(self.SLUG_MAX_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if attempt == self.SLUG_MAX_ATTEMPTS - 1:
+                    raise
+                self.slug = self.generate_slug(unique_suffix=True)
     
-    def generate_slug(self):
-        """Generate SEO-friendly slug."""
+    def generate_slug(self, unique_suffix=False):
+        """Generate SEO-friendly slug, optionally with a random suffix."""
         from django.utils.text import slugify
-        base_slug = slugify(self.title)
-        slug = base_slug
+        base_slug = slugify(self.title) or 'battle'
         
-        counter = 1
-        while Battle.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
+        if unique_suffix:
+            return f"{base_slug}-{secrets.token_hex(3)}"
         
-        return slug
+        return base_slug
     
     def get_absolute_url(self):
         """Get battle's absolute URL."""
@@ -132,55 +216,61 @@ class Battle(TimestampedModel):
         return None
     
     def update_metrics(self):
-        """Update battle engagement metrics."""
-        self.likes_count = self.likes.count()
-        self.shares_count = self.shares.count()
-        self.comments_count = self.comments.count()
-        self.total_votes = self.votes.count()
-        self.save(update_fields=[
-            'likes_count', 'shares_count', 'comments_count', 'total_votes'
-        ])
-    
-    def calculate_trending_score(self):
-        """Calculate trending score based on multiple factors."""
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        now = timezone.now()
-        hours_since_creation = (now - self.created_at).total_seconds() / 3600
+        """
+        Update battle engagement metrics.
         
-        # Vote velocity (votes per hour)
-        recent_votes = self.votes.filter(
-            created_at__gte=now - timedelta(hours=1)
-        ).count()
-        self.vote_velocity = recent_votes
+        The counts are read in one SELECT and written with a partial save,
+        so inside flush_pending_updates() they share the block's single
+        UPDATE with calculate_battle_trending_score().
+        """
+        counts = Battle.objects.filter(pk=self.pk).annotate(
+            _likes_count=subquery_count(BattleLike.objects.all()),
+            _shares_count=subquery_count(BattleShare.objects.all()),
+            _comments_count=subquery_count(BattleComment.objects.all()),
+            _total_votes=subquery_count(Vote.objects.all()),
+        ).values(
+            '_likes_count', '_shares_count', '_comments_count', '_total_votes'
+        ).get()
         
-        # Engagement score
-        self.engagement_score = (
-            self.likes_count * 2 +
-            self.shares_count * 3 +
-            self.comments_count * 1
-        )
-        
-        # Time decay factor (newer battles get higher scores)
-        time_decay = max(0.1, 1 - (hours_since_creation / 168))  # 1 week decay
-        
-        # Calculate trending score
-        self.trending_score = (
-            self.vote_velocity * 0.4 +
-            self.engagement_score * 0.3 +
-            self.total_votes * 0.2 +
-            time_decay * 0.1
+        self.likes_count = counts['_likes_count']
+        self.shares_count = counts['_shares_count']
+        self.comments_count = counts['_comments_count']
+        self.total_votes = counts['_total_votes']
+        self.engagement_score = sum(
+            getattr(self, field) * weight
+            for field, weight in self.ENGAGEMENT_WEIGHTS.items()
         )
         
         self.save(update_fields=[
-            'trending_score', 'vote_velocity', 'engagement_score'
+            'likes_count', 'shares_count', 'comments_count',
+            'total_votes', 'engagement_score'
         ])
     
     def increment_views(self):
-        """Increment view count."""
-        self.views += 1
-        self.save(update_fields=['views'])
+        """
+        Increment view count in the cache.
+        Pending views are flushed to the database periodically; the battle
+        is added to a dirty set so the flush only visits viewed battles.
+        Other cache backends cannot pop the set, so they write through.
+        """
+        client = cache_redis_client()
+        if client is None:
+            Battle.objects.filter(pk=self.pk).update(views=models.F('views') + 1)
+            return
+        
+        pipe = client.pipeline()
+        pipe.incr(cache.make_key(self.views_cache_key(self.pk)))
+        pipe.sadd(cache.make_key(self.VIEWS_DIRTY_KEY), self.pk)
+        pipe.execute()
+    
+    def get_view_count(self):
+        """Get stored views plus views not yet flushed from the cache."""
+        return self.views + (cache.get(self.views_cache_key(self.pk)) or 0)
+    
+    @staticmethod
+    def views_cache_key(battle_id):
+        """Build the pending view counter cache key."""
+        return f"views:{battle_id}"
 
 
 class BattleLike(TimestampedModel):
@@ -2,6 +2,8 @@
 Element model for VoteFight battles.
 """
 from django.db import models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.core.exceptions import ValidationError
 
 from utils.models import BaseModel
@@ -71,23 +73,27 @@ class Element(BaseModel):
         if self.media_type and not self.media_url and not self.media_file:
             raise ValidationError("Media URL or file is required when media type is specified.")
     
-    def save(self, *args, **kwargs):
-        """Override save to update vote statistics."""
-        super().save(*args, **kwargs)
-        self.update_vote_statistics()
-    
-    def update_vote_statistics(self):
-        """Update vote count and percentage."""
-        self.vote_count = self.votes.count()
+    @classmethod
+    def refresh_vote_percentages(cls, *, battle_id):
+        """
+        Recompute vote_percentage for every element of a battle
+        from the stored counters in a single UPDATE.
+        """
+        from .battle import Battle
         
-        # Calculate percentage
-        total_votes = self.battle.total_votes
-        if total_votes > 0:
-            self.vote_percentage = (self.vote_count / total_votes) * 100
-        else:
-            self.vote_percentage = 0.0
+        battle_total = Subquery(
+            Battle.objects.filter(
+                pk=OuterRef('battle_id')
+            ).values('total_votes')[:1]
+        )
+        percentage = F('vote_count') * Value(100.0) / NullIf(battle_total, 0)
         
-        self.save(update_fields=['vote_count', 'vote_percentage'])
+        cls.objects.filter(battle_id=battle_id).update(
+            vote_percentage=Cast(
+                Coalesce(percentage, Value(0.0)),
+                output_field=DecimalField(max_digits=5, decimal_places=2)
+            )
+        )
     
     def get_media_url(self):
         """Get media URL for display."""
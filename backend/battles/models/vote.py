@@ -1,11 +1,16 @@
 """
 Vote model for VoteFight battles.
 """
-from django.db import models
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 
 from utils.models import BaseModel
+from utils.ratelimit import guarded_take, sliding_window_hit, token_bucket_take
 
 User = get_user_model()
 
@@ -55,16 +60,34 @@ class Vote(BaseModel):
         ]
     )
     
+    # has_user_voted results are cached for this long; "not voted" only
+    # briefly, since it flips on the next successful vote
+    VOTED_CACHE_TIMEOUT = 3600
+    NOT_VOTED_CACHE_TIMEOUT = 60
+    
+    # Fraud prevention limits
+    VOTE_COOLDOWN = timedelta(minutes=1)
+    RATE_LIMIT_WINDOW = timedelta(minutes=5)
+    MAX_VOTES_PER_WINDOW = 10
+    
     class Meta:
         db_table = 'battles_vote'
         verbose_name = 'Vote'
         verbose_name_plural = 'Votes'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['battle', 'voter_ip']),
+            models.Index(
+                fields=['battle', 'voter_ip', 'fingerprint'],
+                name='vote_dedup_idx'
+            ),
+            models.Index(
+                fields=['battle', 'user'],
+                name='vote_battle_user_idx',
+                condition=models.Q(user__isnull=False)
+            ),
             models.Index(fields=['battle', 'fingerprint']),
             models.Index(fields=['battle', 'session_key']),
-            models.Index(fields=['created_at']),
+            models.Index(fields=['created_at', 'id']),
         ]
     
     def __str__(self):
@@ -88,97 +111,206 @@ class Vote(BaseModel):
     
     def save(self, *args, **kwargs):
         """Override save to update battle and element statistics."""
+        is_new = self._state.adding
         super().save(*args, **kwargs)
-        self.update_statistics()
+        if is_new:
+            self.update_statistics()
+            transaction.on_commit(self.mark_voted_cache)
     
     def update_statistics(self):
-        """Update battle and element vote statistics."""
-        # Update element vote count
-        self.element.update_vote_statistics()
+        """
+        Schedule recomputation of battle and element vote statistics.
+        Counters are maintained by the vote_count_trg database trigger;
+        percentages and the trending score run in a background task.
+        """
+        from tasks.battle_tasks import schedule_battle_recompute
         
-        # Update battle total votes
-        self.battle.total_votes = self.battle.votes.count()
-        self.battle.save(update_fields=['total_votes'])
+        battle_id = self.battle_id
+        transaction.on_commit(
+            lambda: schedule_battle_recompute(battle_id=battle_id)
+        )
+    
+    def mark_voted_cache(self):
+        """Record this vote in the has_user_voted cache."""
+        cache.set_many(
+            dict.fromkeys(self._voted_cache_keys(), 1),
+            timeout=self.VOTED_CACHE_TIMEOUT
+        )
+    
+    def clear_voted_cache(self):
+        """Forget this vote in the has_user_voted cache."""
+        cache.delete_many(self._voted_cache_keys())
+    
+    def _voted_cache_keys(self):
+        keys = [self.voted_cache_key(
+            self.battle_id,
+            voter_ip=self.voter_ip,
+            fingerprint=self.fingerprint
+        )]
+        if self.user_id:
+            keys.append(self.voted_cache_key(self.battle_id, user_id=self.user_id))
+        return keys
+    
+    @staticmethod
+    def voter_digest(voter_ip, fingerprint):
+        """Short stable digest identifying an IP/fingerprint pair."""
+        return hashlib.blake2b(
+            f"{voter_ip}|{fingerprint}".encode(),
+            digest_size=8
+        ).hexdigest()
     
     @classmethod
-    def has_user_voted(cls, battle, voter_ip=None, fingerprint=None, user=None):
-        """
-        Check if user has already voted in a battle.
-        Supports multiple fraud prevention methods.
-        """
+    def voted_cache_key(cls, battle_id, voter_ip=None, fingerprint=None, user_id=None):
+        """Build the has_user_voted cache key for a user or IP/fingerprint pair."""
+        if user_id:
+            return f"voted:{battle_id}:u{user_id}"
+        
+        return f"voted:{battle_id}:{cls.voter_digest(voter_ip, fingerprint)}"
+    
+    @classmethod
+    def throttle_cache_keys(cls, voter_ip, fingerprint):
+        """Return the (cooldown bucket, rate window) cache keys."""
+        digest = cls.voter_digest(voter_ip, fingerprint)
+        return f"cd:{digest}", f"rl:{digest}"
+    
+    @classmethod
+    def _voted_lookup(cls, battle, voter_ip=None, fingerprint=None, user=None):
+        """Return the (cache key, queryset) identifying a voter's votes."""
         if user and user.is_authenticated:
             # Authenticated user check
-            return cls.objects.filter(
-                battle=battle,
-                user=user
-            ).exists()
+            return (
+                cls.voted_cache_key(battle.id, user_id=user.id),
+                cls.objects.filter(battle=battle, user=user)
+            )
         
-        # Anonymous user check
         if voter_ip and fingerprint:
-            return cls.objects.filter(
-                battle=battle,
-                voter_ip=voter_ip,
-                fingerprint=fingerprint
-            ).exists()
+            # Anonymous user check
+            return (
+                cls.voted_cache_key(
+                    battle.id,
+                    voter_ip=voter_ip,
+                    fingerprint=fingerprint
+                ),
+                cls.objects.filter(
+                    battle=battle,
+                    voter_ip=voter_ip,
+                    fingerprint=fingerprint
+                )
+            )
         
-        return False
+        return None, None
     
     @classmethod
-    def get_vote_cooldown_remaining(cls, voter_ip, fingerprint):
+    def has_user_voted(cls, battle, voter_ip=None, fingerprint=None, user=None):
         """
-        Check if user is in cooldown period.
-        Returns remaining cooldown time in seconds.
+        Check if user has already voted in a battle.
+        Supports multiple fraud prevention methods.
+        Results are cached per battle and voter identity as 1/0, which
+        the combined throttle check reads directly.
         """
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # Check for recent votes (1 minute cooldown)
-        cooldown_period = timedelta(minutes=1)
-        recent_vote = cls.objects.filter(
-            voter_ip=voter_ip,
-            fingerprint=fingerprint,
-            created_at__gte=timezone.now() - cooldown_period
-        ).first()
+        cache_key, votes = cls._voted_lookup(battle, voter_ip, fingerprint, user)
+        if cache_key is None:
+            return False
         
-        if recent_vote:
-            remaining_time = (
-                recent_vote.created_at + cooldown_period - timezone.now()
-            ).total_seconds()
-            return max(0, remaining_time)
+        has_voted = cache.get(cache_key)
+        if has_voted is None:
+            has_voted = votes.exists()
+            cache.set(
+                cache_key,
+                int(has_voted),
+                timeout=(
+                    cls.VOTED_CACHE_TIMEOUT if has_voted
+                    else cls.NOT_VOTED_CACHE_TIMEOUT
+                )
+            )
         
-        return 0
+        return bool(has_voted)
     
     @classmethod
-    def get_vote_rate_limit_status(cls, voter_ip, fingerprint):
+    def check_vote_throttles(cls, battle, voter_ip, fingerprint, user=None, consume=False):
         """
-        Check if user has exceeded rate limits.
-        Returns (is_limited, remaining_votes, reset_time).
+        Check has_user_voted, the cooldown and the rate limit in a single
+        cache round trip. With consume=True the cooldown token and a rate
+        limit hit are taken atomically, and only if all three checks pass.
+        A voted cache miss costs a database lookup and a second round trip.
+        Returns (has_voted, cooldown_remaining, is_limited, remaining_votes,
+        reset_time).
         """
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # Rate limit: 10 votes per 5 minutes
-        rate_limit_window = timedelta(minutes=5)
-        max_votes_per_window = 10
-        
-        recent_votes = cls.objects.filter(
-            voter_ip=voter_ip,
-            fingerprint=fingerprint,
-            created_at__gte=timezone.now() - rate_limit_window
-        ).count()
+        voted_key, _ = cls._voted_lookup(battle, voter_ip, fingerprint, user)
+        cooldown_key, rate_key = cls.throttle_cache_keys(voter_ip, fingerprint)
         
-        is_limited = recent_votes >= max_votes_per_window
-        remaining_votes = max(0, max_votes_per_window - recent_votes)
+        def take(flag=None):
+            return guarded_take(
+                voted_key,
+                cooldown_key,
+                rate_key,
+                capacity=1,
+                refill_per_second=1 / cls.VOTE_COOLDOWN.total_seconds(),
+                limit=cls.MAX_VOTES_PER_WINDOW,
+                window_seconds=cls.RATE_LIMIT_WINDOW.total_seconds(),
+                consume=consume,
+                flag=flag
+            )
         
-        # Calculate reset time
-        oldest_recent_vote = cls.objects.filter(
-            voter_ip=voter_ip,
-            fingerprint=fingerprint,
-            created_at__gte=timezone.now() - rate_limit_window
-        ).order_by('created_at').first()
+        if voted_key is None:
+            # No voter identity, so nothing to look up
+            voted_key = cls.voted_cache_key(
+                battle.id, voter_ip=voter_ip, fingerprint=fingerprint
+            )
+            has_voted, wait_seconds, allowed, remaining_votes, reset_at = take(0)
+        else:
+            has_voted, wait_seconds, allowed, remaining_votes, reset_at = take()
         
-        reset_time = None
-        if oldest_recent_vote:
-            reset_time = oldest_recent_vote.created_at + rate_limit_window
+        if has_voted is None:
+            has_voted, wait_seconds, allowed, remaining_votes, reset_at = take(
+                int(cls.has_user_voted(battle, voter_ip, fingerprint, user))
+            )
         
-        return is_limited, remaining_votes, reset_time
+        reset_time = datetime.fromtimestamp(reset_at, tz=dt_timezone.utc)
+        return bool(has_voted), wait_seconds, not allowed, remaining_votes, reset_time
+    
+    @classmethod
+    def get_vote_throttle_status(cls, voter_ip, fingerprint):
+        """
+        Check cooldown and rate limits without consuming a vote.
+        Returns (cooldown_remaining, is_limited, remaining_votes, reset_time).
+        """
+        return (
+            cls.get_vote_cooldown_remaining(voter_ip, fingerprint),
+            *cls.get_vote_rate_limit_status(voter_ip, fingerprint)
+        )
+    
+    @classmethod
+    def get_vote_cooldown_remaining(cls, voter_ip, fingerprint, consume=False):
+        """
+        Check if user is in cooldown period.
+        The cooldown is a one-token bucket refilled once per VOTE_COOLDOWN;
+        with consume=True an allowed vote takes the token atomically.
+        Returns remaining cooldown time in seconds.
+        """
+        cooldown_key, _ = cls.throttle_cache_keys(voter_ip, fingerprint)
+        _, wait_seconds = token_bucket_take(
+            cooldown_key,
+            capacity=1,
+            refill_per_second=1 / cls.VOTE_COOLDOWN.total_seconds(),
+            consume=consume
+        )
+        return wait_seconds
+    
+    @classmethod
+    def get_vote_rate_limit_status(cls, voter_ip, fingerprint, consume=False):
+        """
+        Check if user has exceeded rate limits (10 votes per 5 minute
+        sliding window). With consume=True an allowed vote is recorded
+        in the same atomic step.
+        Returns (is_limited, remaining_votes, reset_time).
+        """
+        _, rate_key = cls.throttle_cache_keys(voter_ip, fingerprint)
+        allowed, remaining_votes, reset_at = sliding_window_hit(
+            rate_key,
+            limit=cls.MAX_VOTES_PER_WINDOW,
+            window_seconds=cls.RATE_LIMIT_WINDOW.total_seconds(),
+            consume=consume
+        )
+        reset_time = datetime.fromtimestamp(reset_at, tz=dt_timezone.utc)
+        return not allowed, remaining_votes, reset_time
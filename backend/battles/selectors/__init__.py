@@ -3,12 +3,14 @@ Battle selectors for VoteFight application.
 """
 from .battle_selectors import (
     battle_list,
+    battle_list_iter,
     battle_detail,
     battle_get,
     battle_search,
     battle_by_category,
     battle_by_user,
     battle_trending,
+    trending_index_cache_key,
 )
 from .element_selectors import (
     element_list,
@@ -19,22 +21,26 @@ from .vote_selectors import (
     vote_list,
     vote_by_user,
     vote_by_battle,
+    vote_cursor,
     vote_statistics,
 )
 
 __all__ = [
     'battle_list',
+    'battle_list_iter',
     'battle_detail',
     'battle_get',
     'battle_search',
     'battle_by_category',
     'battle_by_user',
     'battle_trending',
+    'trending_index_cache_key',
     'element_list',
     'element_detail',
     'element_get',
     'vote_list',
     'vote_by_user',
     'vote_by_battle',
+    'vote_cursor',
     'vote_statistics',
 ]
@@ -2,41 +2,91 @@
 Battle selectors for VoteFight application.
 Following Django Styleguide patterns.
 """
-from typing import List, Dict, Any, Optional
-from django.db.models import Q, F, Count, Prefetch
+from typing import Any, Dict, Iterator, List, Optional
+from django.db.models import Q, F, Case, Count, Prefetch, QuerySet, Value, When
 from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery, SearchRank
 
+from utils.helpers import subquery_count
 from ..models import Battle, Element, Vote, BattleLike, BattleComment
 from ..models.choices import BattleStatusChoices, CategoryChoices
 
 User = get_user_model()
 
+# Columns list endpoints render; detail views load the full row
+BATTLE_LIST_FIELDS = (
+    'id',
+    'title',
+    'slug',
+    'thumbnail_url',
+    'category',
+    'status',
+    'trending_score',
+    'total_votes',
+    'creator__username',
+    'created_at',
+)
 
-def battle_list(
+# Element columns list cards need for names and vote bars
+ELEMENT_SUMMARY_FIELDS = (
+    'id',
+    'battle',
+    'name',
+    'vote_count',
+    'vote_percentage',
+    'order',
+)
+
+
+def _element_summary_prefetch() -> Prefetch:
+    """
+    Prefetch elements with only the columns list views render.
+    
+    Returns:
+        Prefetch for the elements relation
+    """
+    return Prefetch(
+        'elements',
+        queryset=Element.objects.only(*ELEMENT_SUMMARY_FIELDS)
+    )
+
+
+def _annotate_engagement_counts(queryset: QuerySet) -> QuerySet:
+    """
+    Annotate likes_n, comments_n and votes_n as scalar subqueries.
+    
+    Args:
+        queryset: Battle queryset to annotate
+    
+    Returns:
+        Annotated Battle queryset
+    """
+    return queryset.annotate(
+        likes_n=subquery_count(BattleLike.objects.all()),
+        comments_n=subquery_count(BattleComment.objects.all()),
+        votes_n=subquery_count(Vote.objects.all()),
+    )
+
+
+def _battle_list_queryset(
     *,
-    user: Optional[User] = None,
     category: Optional[str] = None,
     status: Optional[str] = None,
     is_public: bool = True,
-    limit: int = 20,
-    offset: int = 0,
     ordering: str = '-created_at'
-) -> List[Battle]:
+) -> QuerySet:
     """
-    Get list of battles with optional filtering.
+    Build the filtered, ordered battle list queryset.
     
     Args:
-        user: Optional user for personalized results
         category: Optional category filter
         status: Optional status filter
         is_public: Filter for public battles
-        limit: Number of battles to return
-        offset: Offset for pagination
         ordering: Ordering field
     
     Returns:
-        List of Battle instances
+        Battle queryset annotated with likes_n, comments_n and votes_n
     """
     # Build query
     query = Q()
@@ -53,18 +103,86 @@ def battle_list(
         query &= Q(status=BattleStatusChoices.ACTIVE)
     
     # Get battles with optimized queries
-    battles = Battle.objects.filter(query).select_related(
+    return _annotate_engagement_counts(
+        Battle.objects.filter(query)
+    ).select_related(
         'creator'
+    ).only(
+        *BATTLE_LIST_FIELDS
     ).prefetch_related(
-        'elements',
-        Prefetch('votes', queryset=Vote.objects.select_related('element')),
-        'likes',
-        'comments'
-    ).order_by(ordering)[offset:offset + limit]
+        _element_summary_prefetch()
+    ).order_by(ordering)
+
+
+def battle_list(
+    *,
+    user: Optional[User] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    is_public: bool = True,
+    limit: int = 20,
+    offset: int = 0,
+    ordering: str = '-created_at'
+) -> List[Battle]:
+    """
+    Get list of battles with optional filtering.
+    
+    Args:
+        user: Optional user for personalized results
+        category: Optional category filter
+        status: Optional status filter
+        is_public: Filter for public battles
+        limit: Number of battles to return
+        offset: Offset for pagination
+        ordering: Ordering field
+    
+    Returns:
+        List of Battle instances annotated with likes_n, comments_n
+        and votes_n
+    """
+    battles = _battle_list_queryset(
+        category=category,
+        status=status,
+        is_public=is_public,
+        ordering=ordering
+    )[offset:offset + limit]
     
     return list(battles)
 
 
+def battle_list_iter(
+    *,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    is_public: bool = True,
+    ordering: str = '-created_at',
+    chunk_size: int = 2000
+) -> Iterator[Battle]:
+    """
+    Stream all matching battles without materializing the full list.
+    
+    Intended for batch jobs and exports; rows are fetched chunk_size
+    at a time through a server-side cursor.
+    
+    Args:
+        category: Optional category filter
+        status: Optional status filter
+        is_public: Filter for public battles
+        ordering: Ordering field
+        chunk_size: Number of rows fetched per round trip
+    
+    Returns:
+        Iterator of Battle instances annotated with likes_n, comments_n
+        and votes_n
+    """
+    return _battle_list_queryset(
+        category=category,
+        status=status,
+        is_public=is_public,
+        ordering=ordering
+    ).iterator(chunk_size=chunk_size)
+
+
 def battle_detail(
     *,
     battle_id: int,
@@ -80,15 +198,16 @@ def battle_detail(
         increment_views: Whether to increment view count
     
     Returns:
-        Battle instance or None
+        Battle instance annotated with likes_n, comments_n and votes_n,
+        or None
     """
     try:
-        battle = Battle.objects.select_related(
+        battle = _annotate_engagement_counts(
+            Battle.objects.all()
+        ).select_related(
             'creator'
         ).prefetch_related(
             'elements',
-            Prefetch('votes', queryset=Vote.objects.select_related('element')),
-            'likes',
             'comments'
         ).get(id=battle_id)
         
@@ -138,13 +257,15 @@ def battle_search(
     Returns:
         List of matching Battle instances
     """
-    # Build search query
-    search_query = Q(
-        title__icontains=query
-    ) | Q(
-        description__icontains=query
+    search = SearchQuery(
+        query,
+        config=Battle.SEARCH_CONFIG,
+        search_type='websearch'
     )
     
+    # Build search query
+    search_query = Q(search_vector=search)
+    
     # Add category filter
     if category:
         search_query &= Q(category=category)
@@ -152,12 +273,16 @@ def battle_search(
     # Add public filter
     search_query &= Q(is_public=True, status=BattleStatusChoices.ACTIVE)
     
-    # Get search results
-    battles = Battle.objects.filter(search_query).select_related(
+    # Get search results from the GIN index, best matches first
+    battles = Battle.objects.filter(search_query).annotate(
+        rank=SearchRank(F('search_vector'), search)
+    ).select_related(
         'creator'
+    ).only(
+        *BATTLE_LIST_FIELDS
     ).prefetch_related(
-        'elements'
-    ).order_by('-trending_score')[offset:offset + limit]
+        _element_summary_prefetch()
+    ).order_by('-rank', '-trending_score')[offset:offset + limit]
     
     return list(battles)
 
@@ -185,8 +310,10 @@ def battle_by_category(
         is_public=True
     ).select_related(
         'creator'
+    ).only(
+        *BATTLE_LIST_FIELDS
     ).prefetch_related(
-        'elements'
+        _element_summary_prefetch()
     ).order_by('-trending_score')[offset:offset + limit]
     
     return list(battles)
@@ -214,13 +341,28 @@ def battle_by_user(
         status=BattleStatusChoices.ACTIVE
     ).select_related(
         'creator'
+    ).only(
+        *BATTLE_LIST_FIELDS
     ).prefetch_related(
-        'elements'
+        _element_summary_prefetch()
     ).order_by('-created_at')[offset:offset + limit]
     
     return list(battles)
 
 
+def trending_index_cache_key(category: Optional[str] = None) -> str:
+    """
+    Get the cache key holding ranked trending battle IDs.
+    
+    Args:
+        category: Optional category, None for all categories
+    
+    Returns:
+        Cache key string
+    """
+    return f"trending_index_{category or 'all'}"
+
+
 def battle_trending(
     *,
     category: Optional[str] = None,
@@ -230,6 +372,9 @@ def battle_trending(
     """
     Get trending battles.
     
+    Reads the ranked IDs written by the trending recompute task and
+    falls back to the ordering query when the index is not built yet.
+    
     Args:
         category: Optional category filter
         limit: Number of battles to return
@@ -238,11 +383,20 @@ def battle_trending(
     Returns:
         List of trending Battle instances
     """
-    cache_key = f"trending_battles_{category}_{limit}_{offset}"
-    cached_result = cache.get(cache_key)
+    battles = Battle.objects.select_related(
+        'creator'
+    ).only(
+        *BATTLE_LIST_FIELDS
+    ).prefetch_related(
+        _element_summary_prefetch()
+    )
+    
+    ranked_ids = cache.get(trending_index_cache_key(category))
     
-    if cached_result:
-        return cached_result
+    if ranked_ids is not None:
+        page_ids = ranked_ids[offset:offset + limit]
+        battles_by_id = battles.in_bulk(page_ids)
+        return [battles_by_id[pk] for pk in page_ids if pk in battles_by_id]
     
     # Build query
     query = Q(
@@ -255,18 +409,9 @@ def battle_trending(
         query &= Q(category=category)
     
     # Get trending battles
-    battles = Battle.objects.filter(query).select_related(
-        'creator'
-    ).prefetch_related(
-        'elements'
-    ).order_by('-trending_score')[offset:offset + limit]
-    
-    battle_list = list(battles)
-    
-    # Cache result for 5 minutes
-    cache.set(cache_key, battle_list, timeout=300)
-    
-    return battle_list
+    return list(
+        battles.filter(query).order_by('-trending_score')[offset:offset + limit]
+    )
 
 
 def battle_user_voted(
@@ -288,20 +433,7 @@ def battle_user_voted(
     Returns:
         True if user has voted
     """
-    if user and user.is_authenticated:
-        return Vote.objects.filter(
-            battle=battle,
-            user=user
-        ).exists()
-    
-    if voter_ip and fingerprint:
-        return Vote.objects.filter(
-            battle=battle,
-            voter_ip=voter_ip,
-            fingerprint=fingerprint
-        ).exists()
-    
-    return False
+    return Vote.has_user_voted(battle, voter_ip, fingerprint, user)
 
 
 def battle_user_vote_element(
@@ -323,22 +455,27 @@ def battle_user_vote_element(
     Returns:
         Element instance or None
     """
-    vote = None
+    query = Q()
     
     if user and user.is_authenticated:
-        vote = Vote.objects.filter(
-            battle=battle,
-            user=user
-        ).select_related('element').first()
+        query |= Q(votes__user=user)
+    
+    if voter_ip and fingerprint:
+        query |= Q(votes__voter_ip=voter_ip, votes__fingerprint=fingerprint)
+    
+    if not query:
+        return None
     
-    if not vote and voter_ip and fingerprint:
-        vote = Vote.objects.filter(
-            battle=battle,
-            voter_ip=voter_ip,
-            fingerprint=fingerprint
-        ).select_related('element').first()
+    # Prefer the authenticated user's own vote over an IP/fingerprint match
+    preference = Case(
+        When(votes__user=user, then=Value(0)),
+        default=Value(1)
+    ) if user and user.is_authenticated else Value(0)
     
-    return vote.element if vote else None
+    return Element.objects.filter(
+        query,
+        votes__battle=battle
+    ).order_by(preference).first()
 
 
 def battle_statistics(*, battle: Battle) -> Dict[str, Any]:
@@ -356,8 +493,8 @@ def battle_statistics(*, battle: Battle) -> Dict[str, Any]:
         'likes_count': battle.likes_count,
         'shares_count': battle.shares_count,
         'comments_count': battle.comments_count,
-        'views': battle.views,
-        'trending_score': float(battle.trending_score),
+        'views': battle.get_view_count(),
+        'trending_score': battle.trending_score,
         'vote_velocity': battle.vote_velocity,
         'engagement_score': battle.engagement_score,
         'created_at': battle.created_at,
@@ -3,9 +3,10 @@ Element selectors for VoteFight application.
 Following Django Styleguide patterns.
 """
 from typing import List, Optional
-from django.db.models import Prefetch
+from django.db.models import Count, Prefetch
 
 from ..models import Element, Vote
+from .battle_selectors import ELEMENT_SUMMARY_FIELDS
 
 
 def element_list(
@@ -23,12 +24,16 @@ def element_list(
         offset: Offset for pagination
     
     Returns:
-        List of Element instances
+        List of Element instances annotated with ``_vote_count``
     """
+    # Summary columns with a live vote count; element_detail is the only
+    # path that loads individual vote rows
     elements = Element.objects.filter(
         battle_id=battle_id
-    ).prefetch_related(
-        Prefetch('votes', queryset=Vote.objects.all())
+    ).only(
+        *ELEMENT_SUMMARY_FIELDS
+    ).annotate(
+        _vote_count=Count('votes')
     ).order_by('order', 'created_at')[offset:offset + limit]
     
     return list(elements)
@@ -2,14 +2,65 @@
 Vote selectors for VoteFight application.
 Following Django Styleguide patterns.
 """
-from typing import List, Dict, Any, Optional
-from django.db.models import Count, Sum, Avg
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from django.db.models import Avg, CharField, Count, Q, QuerySet, Sum, Value
+from django.db.models.functions import Concat
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 
 from ..models import Vote, Battle, Element
 
 User = get_user_model()
 
+VoteCursor = Tuple[datetime, int]
+
+
+def _paginate_votes(
+    queryset: QuerySet,
+    *,
+    limit: int,
+    offset: int,
+    cursor: Optional[VoteCursor]
+) -> List[Vote]:
+    """
+    Page votes newest first, by keyset when a cursor is given.
+    
+    The cursor is the ``(created_at, id)`` of the last vote on the
+    previous page; OFFSET is only used when no cursor is passed.
+    
+    Args:
+        queryset: Filtered vote queryset
+        limit: Number of votes to return
+        offset: Offset for pagination without a cursor
+        cursor: Optional keyset cursor
+    
+    Returns:
+        List of Vote instances
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    
+    if cursor is None:
+        return list(queryset[offset:offset + limit])
+    
+    created_at, vote_id = cursor
+    return list(queryset.filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=vote_id)
+    )[:limit])
+
+
+def vote_cursor(vote: Vote) -> VoteCursor:
+    """
+    Get the keyset cursor for the page following ``vote``.
+    
+    Args:
+        vote: Last vote of the current page
+    
+    Returns:
+        Cursor tuple of (created_at, id)
+    """
+    return vote.created_at, vote.id
+
 
 def vote_list(
     *,
@@ -17,7 +68,8 @@ def vote_list(
     element_id: Optional[int] = None,
     user_id: Optional[int] = None,
     limit: int = 20,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[VoteCursor] = None
 ) -> List[Vote]:
     """
     Get list of votes with optional filtering.
@@ -28,6 +80,7 @@ def vote_list(
         user_id: Optional user filter
         limit: Number of votes to return
         offset: Offset for pagination
+        cursor: Optional (created_at, id) keyset cursor; overrides offset
     
     Returns:
         List of Vote instances
@@ -43,16 +96,17 @@ def vote_list(
     
     votes = Vote.objects.filter(**query).select_related(
         'battle', 'element', 'user'
-    ).order_by('-created_at')[offset:offset + limit]
+    )
     
-    return list(votes)
+    return _paginate_votes(votes, limit=limit, offset=offset, cursor=cursor)
 
 
 def vote_by_user(
     *,
     user: User,
     limit: int = 20,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[VoteCursor] = None
 ) -> List[Vote]:
     """
     Get votes by a specific user.
@@ -61,6 +115,7 @@ def vote_by_user(
         user: User to get votes for
         limit: Number of votes to return
         offset: Offset for pagination
+        cursor: Optional (created_at, id) keyset cursor; overrides offset
     
     Returns:
         List of Vote instances
@@ -69,16 +124,17 @@ def vote_by_user(
         user=user
     ).select_related(
         'battle', 'element'
-    ).order_by('-created_at')[offset:offset + limit]
+    )
     
-    return list(votes)
+    return _paginate_votes(votes, limit=limit, offset=offset, cursor=cursor)
 
 
 def vote_by_battle(
     *,
     battle: Battle,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[VoteCursor] = None
 ) -> List[Vote]:
     """
     Get votes for a specific battle.
@@ -87,6 +143,7 @@ def vote_by_battle(
         battle: Battle to get votes for
         limit: Number of votes to return
         offset: Offset for pagination
+        cursor: Optional (created_at, id) keyset cursor; overrides offset
     
     Returns:
         List of Vote instances
@@ -95,15 +152,16 @@ def vote_by_battle(
         battle=battle
     ).select_related(
         'element', 'user'
-    ).order_by('-created_at')[offset:offset + limit]
+    )
     
-    return list(votes)
+    return _paginate_votes(votes, limit=limit, offset=offset, cursor=cursor)
 
 
 def vote_statistics(
     *,
     battle: Optional[Battle] = None,
-    element: Optional[Element] = None
+    element: Optional[Element] = None,
+    use_cached_counters: bool = True
 ) -> Dict[str, Any]:
     """
     Get vote statistics.
@@ -111,19 +169,51 @@ def vote_statistics(
     Args:
         battle: Optional battle to get statistics for
         element: Optional element to get statistics for
+        use_cached_counters: Read the denormalized vote_count columns
+            instead of counting votes; totals are summed from them
     
     Returns:
         Dictionary with vote statistics
     """
     if battle:
         # Battle-level statistics
-        total_votes = Vote.objects.filter(battle=battle).count()
-        unique_voters = Vote.objects.filter(battle=battle).values('voter_ip', 'fingerprint').distinct().count()
+        battle_votes = Vote.objects.filter(battle=battle).order_by()
+        unique_voters_expr = Count(
+            Concat(
+                'voter_ip', Value('|'), 'fingerprint',
+                output_field=CharField()
+            ),
+            distinct=True
+        )
+        
+        if use_cached_counters:
+            unique_voters = battle_votes.aggregate(
+                unique_voters=unique_voters_expr
+            )['unique_voters']
+            elements = list(battle.elements.only('id', 'name', 'vote_count'))
+            votes_by_element = {
+                element.id: element.vote_count for element in elements
+            }
+            # Sum the counters just read rather than trusting the caller's
+            # battle instance, so percentages always add up
+            total_votes = sum(votes_by_element.values())
+        else:
+            totals = battle_votes.aggregate(
+                total=Count('id'),
+                unique_voters=unique_voters_expr
+            )
+            total_votes = totals['total']
+            unique_voters = totals['unique_voters']
+            elements = battle.elements.only('id', 'name')
+            
+            # Votes by element in one GROUP BY
+            votes_by_element = dict(
+                battle_votes.values_list('element_id').annotate(count=Count('id'))
+            )
         
-        # Votes by element
         element_stats = []
-        for element in battle.elements.all():
-            element_votes = Vote.objects.filter(battle=battle, element=element).count()
+        for element in elements:
+            element_votes = votes_by_element.get(element.id, 0)
             percentage = (element_votes / total_votes * 100) if total_votes > 0 else 0
             element_stats.append({
                 'element_id': element.id,
@@ -140,8 +230,19 @@ def vote_statistics(
     
     elif element:
         # Element-level statistics
-        total_votes = Vote.objects.filter(element=element).count()
-        battle_total = Vote.objects.filter(battle=element.battle).count()
+        if use_cached_counters:
+            # Fresh counters for all elements of the battle in one query;
+            # the caller's instances may be stale
+            counts = dict(
+                Element.objects.filter(
+                    battle_id=element.battle_id
+                ).values_list('id', 'vote_count')
+            )
+            total_votes = counts.get(element.id, 0)
+            battle_total = sum(counts.values())
+        else:
+            total_votes = Vote.objects.filter(element=element).count()
+            battle_total = Vote.objects.filter(battle=element.battle).count()
         percentage = (total_votes / battle_total * 100) if battle_total > 0 else 0
         
         return {
@@ -168,24 +269,28 @@ def vote_recent_activity(
     Returns:
         List of recent vote activity
     """
-    recent_votes = Vote.objects.select_related(
-        'battle', 'element', 'user'
-    ).order_by('-created_at')[:limit]
+    # Flat projection: no model instances, and the avatar comes from the
+    # same JOIN instead of a profile lookup per row
+    recent_votes = Vote.objects.order_by('-created_at').values(
+        'id', 'battle_id', 'battle__title', 'element__name', 'user_id',
+        'user__username', 'user__profile__avatar', 'created_at', 'is_verified'
+    )[:limit]
     
     activity = []
     for vote in recent_votes:
+        avatar = vote['user__profile__avatar']
         activity.append({
-            'id': vote.id,
-            'battle_id': vote.battle.id,
-            'battle_title': vote.battle.title,
-            'element_name': vote.element.name,
+            'id': vote['id'],
+            'battle_id': vote['battle_id'],
+            'battle_title': vote['battle__title'],
+            'element_name': vote['element__name'],
             'user': {
-                'id': vote.user.id if vote.user else None,
-                'username': vote.user.username if vote.user else 'Anonymous',
-                'avatar_url': vote.user.get_avatar_url() if vote.user else None
+                'id': vote['user_id'],
+                'username': vote['user__username'] or 'Anonymous',
+                'avatar_url': default_storage.url(avatar) if avatar else None
             },
-            'voted_at': vote.created_at,
-            'is_verified': vote.is_verified
+            'voted_at': vote['created_at'],
+            'is_verified': vote['is_verified']
         })
     
     return activity
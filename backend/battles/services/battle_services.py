@@ -2,14 +2,33 @@
 Battle service functions for VoteFight application.
 Following Django Styleguide patterns.
 """
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
-from django.db import transaction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import F
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from utils.helpers import cache_redis_client, redis_script, subquery_count
 from ..models import Battle, Element, BattleLike, BattleShare, BattleComment
 from ..models.choices import BattleStatusChoices, CategoryChoices
+from ..selectors.battle_selectors import trending_index_cache_key
+
+# Ranked trending IDs kept per category
+TRENDING_INDEX_SIZE = 500
+
+# Take and clear pending view counters; missing keys count as 0
+VIEWS_CLAIM_LUA = """
+local counts = {}
+for i, key in ipairs(KEYS) do
+    counts[i] = redis.call('GET', key) or '0'
+    redis.call('DEL', key)
+end
+return counts
+"""
 
 User = get_user_model()
 
@@ -50,8 +69,9 @@ def battle_create(
         if len(elements) > 10:
             raise ValidationError("Battle cannot have more than 10 elements.")
         
-        # Create battle
-        battle = Battle.objects.create(
+        # Create battle; models no longer validate on save, so user
+        # input is validated here (slug collisions are retried on save)
+        battle = Battle(
             creator=user,
             title=title,
             description=description,
@@ -60,10 +80,12 @@ def battle_create(
             is_public=is_public,
             status=BattleStatusChoices.ACTIVE
         )
+        battle.full_clean(exclude=['creator', 'slug'], validate_unique=False)
+        battle.save()
         
-        # Create elements
-        for index, element_data in enumerate(elements):
-            Element.objects.create(
+        # Create elements in a single INSERT
+        element_objs = [
+            Element(
                 battle=battle,
                 name=element_data['name'],
                 description=element_data.get('description', ''),
@@ -71,6 +93,17 @@ def battle_create(
                 media_url=element_data.get('media_url', ''),
                 order=index
             )
+            for index, element_data in enumerate(elements)
+        ]
+        
+        if len({element.name for element in element_objs}) != len(element_objs):
+            raise ValidationError("Battle element names must be unique.")
+        
+        # Uniqueness within the new battle was checked above
+        for element in element_objs:
+            element.full_clean(exclude=['battle'], validate_unique=False)
+        
+        Element.objects.bulk_create(element_objs)
         
         # Update battle metrics
         battle.update_metrics()
@@ -112,6 +145,7 @@ def battle_update(
     if is_public is not None:
         battle.is_public = is_public
     
+    battle.full_clean(exclude=['creator'], validate_unique=False)
     battle.save()
     return battle
 
@@ -135,6 +169,49 @@ def battle_delete(*, battle: Battle, user: User) -> bool:
     return True
 
 
+def _battle_bump_counter(*, battle: Battle, field: str, delta: int) -> None:
+    """
+    Adjust an engagement counter and engagement_score in one UPDATE.
+    
+    Drift from concurrent deletes is corrected by battle_reconcile_metrics.
+    
+    Args:
+        battle: Battle to update
+        field: Counter field name
+        delta: Amount to add (negative to subtract)
+    """
+    Battle.objects.filter(pk=battle.pk).update(**{
+        field: F(field) + delta,
+        'engagement_score': F('engagement_score') + Battle.ENGAGEMENT_WEIGHTS[field] * delta,
+    })
+    battle.refresh_from_db(fields=[field, 'engagement_score'])
+
+
+def battle_reconcile_metrics() -> int:
+    """
+    Recount engagement metrics for all active battles in one UPDATE.
+    
+    Set-based equivalent of Battle.update_metrics, run periodically to
+    correct drift in the incrementally maintained counters.
+    
+    Returns:
+        Number of battles updated
+    """
+    metrics = {
+        'likes_count': subquery_count(BattleLike.objects.all()),
+        'shares_count': subquery_count(BattleShare.objects.all()),
+        'comments_count': subquery_count(BattleComment.objects.all()),
+    }
+    metrics['engagement_score'] = sum(
+        metrics[field] * weight for field, weight in Battle.ENGAGEMENT_WEIGHTS.items()
+    )
+    
+    return Battle.objects.filter(
+        status=BattleStatusChoices.ACTIVE,
+        is_active=True
+    ).update(**metrics)
+
+
 def battle_like(*, battle: Battle, user: User) -> BattleLike:
     """
     Like a battle.
@@ -152,7 +229,7 @@ def battle_like(*, battle: Battle, user: User) -> BattleLike:
     )
     
     if created:
-        battle.update_metrics()
+        _battle_bump_counter(battle=battle, field='likes_count', delta=1)
     
     return like
 
@@ -168,13 +245,13 @@ def battle_unlike(*, battle: Battle, user: User) -> bool:
     Returns:
         True if unliked successfully
     """
-    try:
-        like = BattleLike.objects.get(battle=battle, user=user)
-        like.delete()
-        battle.update_metrics()
-        return True
-    except BattleLike.DoesNotExist:
+    # Filtered delete, so two concurrent unlikes cannot both decrement
+    deleted, _ = BattleLike.objects.filter(battle=battle, user=user).delete()
+    if not deleted:
         return False
+    
+    _battle_bump_counter(battle=battle, field='likes_count', delta=-1)
+    return True
 
 
 def battle_share(
@@ -200,7 +277,7 @@ def battle_share(
         platform=platform
     )
     
-    battle.update_metrics()
+    _battle_bump_counter(battle=battle, field='shares_count', delta=1)
     return share
 
 
@@ -223,14 +300,16 @@ def battle_comment(
     Returns:
         Created BattleComment instance
     """
-    comment = BattleComment.objects.create(
+    comment = BattleComment(
         battle=battle,
         user=user,
         content=content,
         parent=parent
     )
+    comment.full_clean(exclude=['battle', 'user', 'parent'])
+    comment.save()
     
-    battle.update_metrics()
+    _battle_bump_counter(battle=battle, field='comments_count', delta=1)
     return comment
 
 
@@ -249,8 +328,11 @@ def battle_comment_delete(*, comment: BattleComment, user: User) -> bool:
     if comment.user != user and not user.is_staff:
         raise ValidationError("You don't have permission to delete this comment.")
     
-    comment.delete()
-    comment.battle.update_metrics()
+    # Replies cascade with the comment and are counted in comments_count too
+    _, deleted = BattleComment.objects.filter(pk=comment.pk).delete()
+    removed = deleted.get(BattleComment._meta.label, 0)
+    if removed:
+        _battle_bump_counter(battle=comment.battle, field='comments_count', delta=-removed)
     return True
 
 
@@ -279,8 +361,101 @@ def battle_get_engagement_stats(*, battle: Battle) -> Dict[str, Any]:
         'likes_count': battle.likes_count,
         'shares_count': battle.shares_count,
         'comments_count': battle.comments_count,
-        'views': battle.views,
-        'trending_score': float(battle.trending_score),
+        'views': battle.get_view_count(),
+        'trending_score': battle.trending_score,
         'vote_velocity': battle.vote_velocity,
         'engagement_score': battle.engagement_score,
     }
+
+
+def battle_build_trending_index() -> None:
+    """
+    Cache ranked trending battle IDs globally and per category.
+    
+    Readers of battle_trending slice these lists instead of running the
+    ordering query, so no request pays for a cold cache key.
+    """
+    ranked = Battle.objects.filter(
+        status=BattleStatusChoices.ACTIVE,
+        is_active=True,
+        is_public=True
+    ).order_by('-trending_score').values_list('id', 'category')
+    
+    index = defaultdict(list)
+    for battle_id, category in ranked.iterator():
+        if len(index[None]) < TRENDING_INDEX_SIZE:
+            index[None].append(battle_id)
+        if len(index[category]) < TRENDING_INDEX_SIZE:
+            index[category].append(battle_id)
+    
+    # Outlive a few missed runs before readers fall back to the database
+    timeout = settings.VOTEFIGHT_SETTINGS['TRENDING_UPDATE_INTERVAL'] * 3
+    cache.set_many(
+        {
+            trending_index_cache_key(category): index.get(category, [])
+            for category in [None, *CategoryChoices.values]
+        },
+        timeout=timeout
+    )
+
+
+def battle_flush_view_counts(*, batch_size: int = 1000) -> int:
+    """
+    Move pending view counts from the cache into Battle.views.
+    
+    Only battles popped from the dirty set are visited, so the cost
+    follows the number of viewed battles rather than the table size.
+    Counters are taken and cleared atomically before the UPDATE, and put
+    back if it fails.
+    
+    Args:
+        batch_size: Number of battles per cache read and UPDATE
+    
+    Returns:
+        Number of views flushed
+    """
+    client = cache_redis_client()
+    if client is None:
+        return 0
+    
+    dirty_key = cache.make_key(Battle.VIEWS_DIRTY_KEY)
+    claim = redis_script(client, VIEWS_CLAIM_LUA)
+    flushed = 0
+    
+    while True:
+        battle_ids = [int(battle_id) for battle_id in client.spop(dirty_key, batch_size)]
+        if not battle_ids:
+            break
+        
+        keys = [cache.make_key(Battle.views_cache_key(battle_id)) for battle_id in battle_ids]
+        counts = claim(keys=keys, client=client)
+        pending = {
+            battle_id: int(count)
+            for battle_id, count in zip(battle_ids, counts)
+            if int(count)
+        }
+        
+        if pending:
+            try:
+                Battle.objects.bulk_update(
+                    [
+                        Battle(pk=battle_id, views=F('views') + count)
+                        for battle_id, count in pending.items()
+                    ],
+                    ['views']
+                )
+            except DatabaseError:
+                # Return the views so the next run retries them
+                pipe = client.pipeline()
+                for battle_id, count in pending.items():
+                    pipe.incrby(cache.make_key(Battle.views_cache_key(battle_id)), count)
+                    pipe.sadd(dirty_key, battle_id)
+                pipe.execute()
+                raise
+            
+            flushed += sum(pending.values())
+        
+        if len(battle_ids) < batch_size:
+            break
+    
+    return flushed
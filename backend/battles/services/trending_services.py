@@ -2,15 +2,101 @@
 Trending services for VoteFight application.
 Following Django Styleguide patterns.
 """
-from typing import List, Dict, Any, Optional
-from django.db.models import Q, F, Count, Sum
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+from django.db import connection
+from django.db.models import Q, F, Count, Prefetch, Sum
 from django.core.cache import cache
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 
-from ..models import Battle
+from ..models import Battle, Element, Vote
 from ..models.choices import BattleStatusChoices, CategoryChoices
 
+_CATEGORY_DISPLAY = dict(CategoryChoices.choices)
+
+TRENDING_BATCH_SIZE = 500
+
+# Set-based equivalent of _score() and _factor() for PostgreSQL
+TRENDING_UPDATE_SQL = """
+WITH recent AS (
+    SELECT battle_id, COUNT(*) AS n
+    FROM battles_vote
+    WHERE created_at >= %(vote_cutoff)s
+    GROUP BY battle_id
+), factors AS (
+    SELECT category,
+           CASE WHEN COUNT(*) > 10 THEN 1.2
+                WHEN COUNT(*) > 5 THEN 1.0
+                ELSE 0.8 END AS factor
+    FROM battles_battle
+    WHERE status = %(active)s AND is_active AND created_at >= %(category_cutoff)s
+    GROUP BY category
+), aged AS (
+    SELECT b.id, b.category, b.total_votes, COALESCE(r.n, 0) AS recent_votes,
+           EXTRACT(EPOCH FROM %(now)s - b.created_at) / 3600 AS hours,
+           b.engagement_score AS engagement
+    FROM battles_battle b
+    LEFT JOIN recent r ON r.battle_id = b.id
+    WHERE b.status = %(active)s AND b.is_active
+), scored AS (
+    SELECT a.id, a.engagement, a.total_votes,
+           a.recent_votes / GREATEST(1, LEAST(24, a.hours)) AS velocity,
+           GREATEST(0.1, 1 - a.hours / 168) AS decay,
+           COALESCE(f.factor, 0.8) AS factor
+    FROM aged a
+    LEFT JOIN factors f ON f.category = a.category
+)
+UPDATE battles_battle AS b SET
+    vote_velocity = FLOOR(s.velocity),
+    trending_score = s.velocity * 0.4 + s.engagement * 0.3
+        + s.total_votes * 0.2 + s.decay * 0.1 + s.factor * 0.1
+FROM scored s
+WHERE b.id = s.id
+"""
+
+# Serialized per-battle trending entries
+TRENDING_ENTRY_TIMEOUT = 300
+
+
+def _trending_elements_prefetch() -> Prefetch:
+    """
+    Prefetch elements with only the columns trending payloads use.
+    
+    Returns:
+        Prefetch for the elements relation
+    """
+    return Prefetch(
+        'elements',
+        queryset=Element.objects.only('id', 'battle', 'name', 'order', 'vote_count')
+    )
+
+
+def _serialize_elements(battle: Battle) -> List[Dict[str, Any]]:
+    """
+    Serialize prefetched elements, deriving percentages from the
+    battle's vote total rather than the asynchronously refreshed column.
+    
+    Args:
+        battle: Battle with prefetched elements
+    
+    Returns:
+        List of element data
+    """
+    total_votes = battle.total_votes
+    return [
+        {
+            'id': element.id,
+            'name': element.name,
+            'vote_count': element.vote_count,
+            'vote_percentage': (
+                round(element.vote_count / total_votes * 100, 2)
+                if total_votes > 0 else 0.0
+            )
+        }
+        for element in battle.elements.all()
+    ]
+
 
 def update_trending_scores() -> Dict[str, int]:
     """
@@ -19,34 +105,148 @@ def update_trending_scores() -> Dict[str, int]:
     Returns:
         Dictionary with update statistics
     """
+    now = timezone.now()
+    
+    if connection.vendor == 'postgresql':
+        updated_count = _update_trending_scores_sql(now)
+    else:
+        updated_count = _update_trending_scores_batched(now)
+    
+    # Clear trending cache
+    cache.delete('trending_battles')
+    cache.delete('trending_battles_global')
+    
+    return {
+        'updated_battles': updated_count,
+        'timestamp': now
+    }
+
+
+def _update_trending_scores_sql(now: datetime) -> int:
+    """
+    Score every active battle server-side in a single UPDATE ... FROM.
+    
+    Args:
+        now: Reference time for velocity, decay and category windows
+    
+    Returns:
+        Number of battles updated
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(TRENDING_UPDATE_SQL, {
+            'now': now,
+            'vote_cutoff': now - timedelta(hours=24),
+            'category_cutoff': _category_window_end(now) - timedelta(days=7),
+            'active': BattleStatusChoices.ACTIVE,
+        })
+        return cursor.rowcount
+
+
+def _update_trending_scores_batched(now: datetime) -> int:
+    """
+    Score active battles in Python, streaming rows and writing batches.
+    
+    Args:
+        now: Reference time for velocity, decay and category windows
+    
+    Returns:
+        Number of battles updated
+    """
+    # Recent vote counts for every battle in one grouped query
     active_battles = Battle.objects.filter(
         status=BattleStatusChoices.ACTIVE,
         is_active=True
+    ).only(
+        'id', 'category', 'created_at', 'engagement_score', 'total_votes'
+    ).annotate(
+        recent_votes_count=Count(
+            'votes',
+            filter=Q(votes__created_at__gte=now - timedelta(hours=24))
+        )
     )
     
+    category_factors = get_category_trending_factors(
+        now=_category_window_end(now)
+    )
+    update_fields = ['trending_score', 'vote_velocity']
     updated_count = 0
-    for battle in active_battles:
-        calculate_battle_trending_score(battle=battle)
-        updated_count += 1
+    batch = []
+    # Stream rows so memory stays bounded by the batch size
+    for battle in active_battles.iterator(chunk_size=TRENDING_BATCH_SIZE):
+        trending_score, vote_velocity = _score(
+            battle=battle,
+            recent_votes=battle.recent_votes_count,
+            category_factor=category_factors.get(battle.category, _factor(0)),
+            now=now
+        )
+        battle.trending_score = trending_score
+        battle.vote_velocity = int(vote_velocity)
+        batch.append(battle)
+        
+        if len(batch) >= TRENDING_BATCH_SIZE:
+            Battle.objects.bulk_update(batch, update_fields)
+            updated_count += len(batch)
+            batch = []
+    
+    if batch:
+        Battle.objects.bulk_update(batch, update_fields)
+        updated_count += len(batch)
+    
+    return updated_count
+
+
+def _serialize_trending_battle(battle: Battle) -> Dict[str, Any]:
+    """
+    Serialize a battle for trending payloads.
     
-    # Clear trending cache
-    cache.delete('trending_battles')
-    cache.delete('trending_battles_global')
+    Args:
+        battle: Battle with creator profile selected and elements prefetched
     
+    Returns:
+        Battle data
+    """
     return {
-        'updated_battles': updated_count,
-        'timestamp': timezone.now()
+        'id': battle.id,
+        'title': battle.title,
+        'description': battle.description,
+        'category': battle.category,
+        'creator': {
+            'id': battle.creator.id,
+            'username': battle.creator.username,
+            'avatar_url': battle.creator.get_avatar_url()
+        },
+        'trending_score': battle.trending_score,
+        'total_votes': battle.total_votes,
+        'likes_count': battle.likes_count,
+        'views': battle.views,
+        'created_at': battle.created_at,
+        'elements': _serialize_elements(battle)
     }
 
 
-def get_trending_battles(
-    *,
-    category: Optional[str] = None,
-    limit: int = 20,
-    offset: int = 0
+def _trending_entry_cache_key(
+    battle_id: int,
+    updated_at: datetime,
+    trending_score: float,
+    total_votes: int
+) -> str:
+    """
+    Cache key of a serialized trending entry, versioned by the columns
+    that change without bumping updated_at.
+    """
+    return (
+        f"trending_entry_{battle_id}_{int(updated_at.timestamp())}"
+        f"_{int(trending_score * 1000)}_{total_votes}"
+    )
+
+
+def _compute_trending(
+    category: Optional[str],
+    limit: int,
+    offset: int
 ) -> List[Dict[str, Any]]:
     """
-    Get trending battles.
+    Query and serialize trending battles, bypassing the cache.
     
     Args:
         category: Optional category filter
@@ -56,13 +256,6 @@ def get_trending_battles(
     Returns:
         List of trending battle data
     """
-    cache_key = f"trending_battles_{category}_{limit}_{offset}"
-    cached_result = cache.get(cache_key)
-    
-    if cached_result:
-        return cached_result
-    
-    # Build query
     query = Q(
         status=BattleStatusChoices.ACTIVE,
         is_active=True,
@@ -72,119 +265,176 @@ def get_trending_battles(
     if category:
         query &= Q(category=category)
     
-    # Get trending battles
-    battles = Battle.objects.filter(query).select_related(
-        'creator'
-    ).prefetch_related(
-        'elements'
-    ).order_by('-trending_score')[offset:offset + limit]
-    
-    trending_data = []
-    for battle in battles:
-        trending_data.append({
-            'id': battle.id,
-            'title': battle.title,
-            'description': battle.description,
-            'category': battle.category,
-            'creator': {
-                'id': battle.creator.id,
-                'username': battle.creator.username,
-                'avatar_url': battle.creator.get_avatar_url()
-            },
-            'trending_score': float(battle.trending_score),
-            'total_votes': battle.total_votes,
-            'likes_count': battle.likes_count,
-            'views': battle.views,
-            'created_at': battle.created_at,
-            'elements': [
-                {
-                    'id': element.id,
-                    'name': element.name,
-                    'vote_count': element.vote_count,
-                    'vote_percentage': float(element.vote_percentage)
-                }
-                for element in battle.elements.all()
-            ]
-        })
+    ranked = list(
+        Battle.objects.filter(query).order_by('-trending_score').values_list(
+            'id', 'updated_at', 'trending_score', 'total_votes', 'views'
+        )[offset:offset + limit]
+    )
     
-    # Cache result for 5 minutes
-    cache.set(cache_key, trending_data, timeout=300)
+    # Reuse serialized entries shared across categories and users; the key
+    # changes whenever the battle is saved or its score/votes move
+    keys = {
+        battle_id: _trending_entry_cache_key(battle_id, updated_at, score, votes)
+        for battle_id, updated_at, score, votes, _ in ranked
+    }
+    entries = cache.get_many(list(keys.values()))
+    
+    # Views are bumped in the cache without touching the row, so they
+    # are read fresh for the page, as in Battle.get_view_count()
+    pending_views = cache.get_many([
+        Battle.views_cache_key(battle_id) for battle_id in keys
+    ])
+    
+    missing = [battle_id for battle_id, key in keys.items() if key not in entries]
+    if missing:
+        battles = Battle.objects.select_related(
+            'creator__profile'
+        ).prefetch_related(
+            _trending_elements_prefetch()
+        ).in_bulk(missing)
+        fresh = {
+            keys[battle_id]: _serialize_trending_battle(battle)
+            for battle_id, battle in battles.items()
+        }
+        cache.set_many(fresh, timeout=TRENDING_ENTRY_TIMEOUT)
+        entries.update(fresh)
+    
+    # Battles deleted between the two queries are skipped
+    return [
+        {
+            **entries[keys[battle_id]],
+            'views': views + (pending_views.get(Battle.views_cache_key(battle_id)) or 0)
+        }
+        for battle_id, *_, views in ranked
+        if keys[battle_id] in entries
+    ]
+
+
+def get_trending_battles(
+    *,
+    category: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Get trending battles.
+    
+    Args:
+        category: Optional category filter
+        limit: Number of battles to return
+        offset: Offset for pagination
+    
+    Returns:
+        List of trending battle data
+    """
+    cache_key = f"trending_battles_{category}_{limit}_{offset}"
     
-    return trending_data
+    # Cache result for 5 minutes
+    return cache.get_or_set(
+        cache_key,
+        lambda: _compute_trending(category, limit, offset),
+        timeout=300
+    )
 
 
-def calculate_battle_trending_score(*, battle: Battle) -> float:
+def calculate_battle_trending_score(
+    *,
+    battle: Battle,
+    now: Optional[datetime] = None,
+    category_factor: Optional[float] = None
+) -> float:
     """
-    Calculate trending score for a specific battle.
+    Calculate and save the trending score of a single battle.
+    
+    Uses the same _score() as update_trending_scores(), so a battle gets
+    the same score whichever path ran last.
     
     Args:
         battle: Battle to calculate score for
+        now: Reference time shared across a batch; defaults to now
+        category_factor: Precomputed category factor; looked up when omitted
     
     Returns:
         Calculated trending score
     """
-    now = timezone.now()
-    hours_since_creation = (now - battle.created_at).total_seconds() / 3600
+    if now is None:
+        now = timezone.now()
+    
+    if category_factor is None:
+        category_factor = get_category_trending_factor(battle.category, now=now)
     
-    # Vote velocity (votes per hour in last 24 hours)
     recent_votes = battle.votes.filter(
         created_at__gte=now - timedelta(hours=24)
     ).count()
-    vote_velocity = recent_votes / max(1, min(24, hours_since_creation))
     
-    # Engagement score
-    engagement_score = (
-        battle.likes_count * 2 +
-        battle.shares_count * 3 +
-        battle.comments_count * 1 +
-        battle.views * 0.1
+    trending_score, vote_velocity = _score(
+        battle=battle,
+        recent_votes=recent_votes,
+        category_factor=category_factor,
+        now=now
     )
     
+    # Update battle
+    battle.trending_score = trending_score
+    battle.vote_velocity = int(vote_velocity)
+    battle.save(update_fields=['trending_score', 'vote_velocity'])
+    
+    return trending_score
+
+
+def _score(
+    *,
+    battle: Battle,
+    recent_votes: int,
+    category_factor: float,
+    now: datetime
+) -> Tuple[float, float]:
+    """
+    Compute trending score components without touching the database.
+    
+    This is the one definition of the trending score; TRENDING_UPDATE_SQL
+    mirrors it. engagement_score is read as stored, it is maintained from
+    Battle.ENGAGEMENT_WEIGHTS by the counter updates.
+    
+    Args:
+        battle: Battle to score
+        recent_votes: Votes received in the last 24 hours
+        category_factor: Trending factor of the battle's category
+        now: Reference time for velocity and decay
+    
+    Returns:
+        Tuple of (trending_score, vote_velocity)
+    """
+    hours_since_creation = (now - battle.created_at).total_seconds() / 3600
+    
+    # Vote velocity (votes per hour in last 24 hours)
+    vote_velocity = recent_votes / max(1, min(24, hours_since_creation))
+    
     # Time decay factor (newer battles get higher scores)
     time_decay = max(0.1, 1 - (hours_since_creation / 168))  # 1 week decay
     
-    # Category trending factor
-    category_trending = get_category_trending_factor(battle.category)
-    
     # Calculate final trending score
     trending_score = (
         vote_velocity * 0.4 +
-        engagement_score * 0.3 +
+        battle.engagement_score * 0.3 +
         battle.total_votes * 0.2 +
         time_decay * 0.1 +
-        category_trending * 0.1
+        category_factor * 0.1
     )
     
-    # Update battle
-    battle.trending_score = trending_score
-    battle.vote_velocity = int(vote_velocity)
-    battle.engagement_score = int(engagement_score)
-    battle.save(update_fields=[
-        'trending_score', 'vote_velocity', 'engagement_score'
-    ])
-    
-    return trending_score
+    return trending_score, vote_velocity
 
 
-def get_category_trending_factor(category: str) -> float:
+def _factor(recent_battles: int) -> float:
     """
-    Get trending factor for a category.
+    Map a category's recent battle count to its trending factor.
     
     Args:
-        category: Category to get factor for
+        recent_battles: Active battles created in the last 7 days
     
     Returns:
         Category trending factor
     """
-    # Get recent battles in category
-    recent_battles = Battle.objects.filter(
-        category=category,
-        status=BattleStatusChoices.ACTIVE,
-        is_active=True,
-        created_at__gte=timezone.now() - timedelta(days=7)
-    ).count()
-    
-    # Calculate factor based on category activity
     if recent_battles > 10:
         return 1.2  # High activity
     elif recent_battles > 5:
@@ -193,6 +443,80 @@ def get_category_trending_factor(category: str) -> float:
         return 0.8  # Low activity
 
 
+def _recent_category_battles(now: datetime):
+    """
+    Active battles created in the 7 days before ``now``.
+    """
+    return Battle.objects.filter(
+        status=BattleStatusChoices.ACTIVE,
+        is_active=True,
+        created_at__gte=now - timedelta(days=7)
+    )
+
+
+def get_category_trending_factors(*, now: datetime) -> Dict[str, float]:
+    """
+    Get trending factors for every category in one grouped query.
+    
+    Categories without recent battles are absent; callers should fall
+    back to ``_factor(0)``.
+    
+    Args:
+        now: Reference time for the 7 day activity window
+    
+    Returns:
+        Dictionary mapping category to trending factor
+    """
+    counts = _recent_category_battles(now).order_by().values_list(
+        'category'
+    ).annotate(n=Count('id'))
+    
+    return {category: _factor(n) for category, n in counts}
+
+
+def _category_window_end(now: datetime) -> datetime:
+    """
+    Truncate ``now`` to the hour, so every scoring path measures category
+    activity over the same 7 day window as the memoized single-battle
+    lookup.
+    """
+    return datetime.fromtimestamp(
+        int(now.timestamp() // 3600) * 3600, tz=dt_timezone.utc
+    )
+
+
+@lru_cache(maxsize=64)
+def _category_trending_factor(category: str, hour: int) -> float:
+    """
+    Memoized factor lookup; ``hour`` buckets entries so they expire hourly.
+    """
+    window_end = datetime.fromtimestamp(hour * 3600, tz=dt_timezone.utc)
+    return _factor(
+        _recent_category_battles(window_end).filter(category=category).count()
+    )
+
+
+def get_category_trending_factor(
+    category: str,
+    *,
+    now: Optional[datetime] = None
+) -> float:
+    """
+    Get trending factor for a category.
+    
+    Args:
+        category: Category to get factor for
+        now: Reference time; defaults to now
+    
+    Returns:
+        Category trending factor
+    """
+    if now is None:
+        now = timezone.now()
+    hour = int(now.timestamp() // 3600)
+    return _category_trending_factor(category, hour)
+
+
 def get_trending_categories(*, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Get trending categories.
@@ -225,7 +549,7 @@ def get_trending_categories(*, limit: int = 10) -> List[Dict[str, Any]]:
     for stat in category_stats:
         trending_categories.append({
             'category': stat['category'],
-            'category_display': dict(CategoryChoices.choices)[stat['category']],
+            'category_display': _CATEGORY_DISPLAY[stat['category']],
             'battle_count': stat['battle_count'],
             'total_votes': stat['total_votes'] or 0,
             'avg_trending_score': float(stat['avg_trending_score'] or 0)
@@ -237,6 +561,59 @@ def get_trending_categories(*, limit: int = 10) -> List[Dict[str, Any]]:
     return trending_categories
 
 
+def get_user_preferred_categories(*, user_id: int) -> List[str]:
+    """
+    Get categories a user has voted in or created battles in.
+    
+    Args:
+        user_id: User ID
+    
+    Returns:
+        List of category values
+    """
+    cache_key = f"preferred_categories_{user_id}"
+    
+    def compute() -> List[str]:
+        # Start from the user's votes (indexed on user_id) rather than
+        # joining every battle to its votes; UNION dedups both sides
+        voted = Vote.objects.filter(
+            user_id=user_id
+        ).order_by().values_list('battle__category', flat=True)
+        created = Battle.objects.filter(
+            creator_id=user_id
+        ).order_by().values_list('category', flat=True)
+        return list(voted.union(created))
+    
+    # Preferences change slowly; cache for 1 hour
+    return cache.get_or_set(cache_key, compute, timeout=3600)
+
+
+def _compute_personalized_trending(user_id: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Build a user's personalized trending list from shared category lists.
+    
+    Args:
+        user_id: User ID
+        limit: Number of battles to return
+    
+    Returns:
+        List of personalized trending battle data
+    """
+    preferred_categories = get_user_preferred_categories(user_id=user_id)
+    
+    if not preferred_categories:
+        return get_trending_battles(limit=limit)
+    
+    # Merge the per-category trending lists, which are cached once and
+    # shared by every user, instead of querying per user
+    candidates = []
+    for category in preferred_categories:
+        candidates.extend(get_trending_battles(category=category, limit=limit))
+    candidates.sort(key=lambda battle: battle['trending_score'], reverse=True)
+    
+    return candidates[:limit]
+
+
 def get_personalized_trending(
     *,
     user_id: int,
@@ -253,70 +630,10 @@ def get_personalized_trending(
         List of personalized trending battle data
     """
     cache_key = f"personalized_trending_{user_id}_{limit}"
-    cached_result = cache.get(cache_key)
-    
-    if cached_result:
-        return cached_result
-    
-    # Get user's voting history to determine preferences
-    user_votes = Battle.objects.filter(
-        votes__user_id=user_id
-    ).values_list('category', flat=True).distinct()
-    
-    # Get user's created battles categories
-    user_battles = Battle.objects.filter(
-        creator_id=user_id
-    ).values_list('category', flat=True).distinct()
-    
-    # Combine preferences
-    preferred_categories = list(set(list(user_votes) + list(user_battles)))
-    
-    # Build query with category preferences
-    query = Q(
-        status=BattleStatusChoices.ACTIVE,
-        is_active=True,
-        is_public=True
-    )
-    
-    if preferred_categories:
-        query &= Q(category__in=preferred_categories)
-    
-    # Get personalized trending battles
-    battles = Battle.objects.filter(query).select_related(
-        'creator'
-    ).prefetch_related(
-        'elements'
-    ).order_by('-trending_score')[:limit]
-    
-    personalized_data = []
-    for battle in battles:
-        personalized_data.append({
-            'id': battle.id,
-            'title': battle.title,
-            'description': battle.description,
-            'category': battle.category,
-            'creator': {
-                'id': battle.creator.id,
-                'username': battle.creator.username,
-                'avatar_url': battle.creator.get_avatar_url()
-            },
-            'trending_score': float(battle.trending_score),
-            'total_votes': battle.total_votes,
-            'likes_count': battle.likes_count,
-            'views': battle.views,
-            'created_at': battle.created_at,
-            'elements': [
-                {
-                    'id': element.id,
-                    'name': element.name,
-                    'vote_count': element.vote_count,
-                    'vote_percentage': float(element.vote_percentage)
-                }
-                for element in battle.elements.all()
-            ]
-        })
     
     # Cache result for 10 minutes
-    cache.set(cache_key, personalized_data, timeout=600)
-    
-    return personalized_data
+    return cache.get_or_set(
+        cache_key,
+        lambda: _compute_personalized_trending(user_id, limit),
+        timeout=600
+    )
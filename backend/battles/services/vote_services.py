@@ -2,18 +2,63 @@
 Vote service functions for VoteFight application.
 Following Django Styleguide patterns.
 """
-from typing import Dict, Any, Optional, Tuple
-from django.db import transaction
+import json
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.db.models import Count, Q
+from django.db.models.functions import Now
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.core.cache import cache
+from django.utils.dateparse import parse_datetime
 
+from utils.helpers import LIST_CLAIM_LUA, cache_redis_client, redis_script
+from vote_fight.db_routers import read_replica_alias
 from ..models import Vote, Battle, Element
 from ..models.choices import BattleStatusChoices
+from .trending_services import calculate_battle_trending_score
 
 User = get_user_model()
 
+# Redis list holding votes accepted but not yet inserted
+VOTE_BUFFER_KEY = 'vote_buffer'
+VOTE_BUFFER_BATCH_SIZE = 1000
+
+# Batch being inserted; removed only after its transaction commits
+VOTE_BUFFER_PROCESSING_KEY = 'vote_buffer:processing'
+
+# One flush at a time; must outlast a flush of the whole buffer
+VOTE_BUFFER_FLUSH_LOCK_KEY = 'vote_buffer_flush_lock'
+VOTE_BUFFER_FLUSH_LOCK_TIMEOUT = 300
+
+# Cached per-user vote totals for get_user_vote_history
+USER_VOTE_COUNT_TIMEOUT = 60
+
+# Redis hash of per-element vote counts and names backing get_vote_statistics
+VOTE_COUNTS_TIMEOUT = 300
+
+# Increment only an already populated hash; a partial hash would
+# under-report until it expires
+VOTE_COUNTS_INCR_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+end
+"""
+
+# Fill the hash only if no concurrent reader filled it first, so counts
+# already being incremented are never overwritten
+# ARGV = timeout, field, value, field, value, ...
+VOTE_COUNTS_FILL_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+"""
+
 
 def vote_create(
     *,
@@ -38,12 +83,15 @@ def vote_create(
         session_key: Session key
     
     Returns:
-        Created Vote instance
+        Created Vote instance (unsaved when VOTE_BUFFER_ENABLED, the
+        row is inserted by the next buffer flush)
         
     Raises:
         ValidationError: If vote is not allowed
     """
-    # Check battle status
+    # Early rejection from the loaded battle; on PostgreSQL the INSERT
+    # re-checks the same conditions so a battle closing in between is
+    # still caught
     if battle.status != BattleStatusChoices.ACTIVE:
         raise ValidationError("This battle is no longer active.")
     
@@ -54,23 +102,46 @@ def vote_create(
     if battle.deadline and battle.deadline <= timezone.now():
         raise ValidationError("This battle has expired.")
     
-    # Check if user has already voted
-    if Vote.has_user_voted(battle, voter_ip, fingerprint, user):
+    # Vote.clean() equivalents, without full_clean()'s per-field queries
+    if element.battle_id != battle.id:
+        raise ValidationError("Element must belong to the specified battle.")
+    
+    if not voter_ip:
+        raise ValidationError("Voter IP is required.")
+    
+    if not fingerprint:
+        raise ValidationError("Fingerprint is required.")
+    
+    # Voted, cooldown and rate limit checks in one round trip; the
+    # cooldown token and rate limit hit are only taken if all pass
+    has_voted, cooldown_remaining, is_limited, _, _ = Vote.check_vote_throttles(
+        battle, voter_ip, fingerprint, user, consume=True
+    )
+    if has_voted:
         raise ValidationError("You have already voted in this battle.")
     
-    # Check cooldown period
-    cooldown_remaining = Vote.get_vote_cooldown_remaining(voter_ip, fingerprint)
     if cooldown_remaining > 0:
         raise ValidationError(f"Please wait {int(cooldown_remaining)} seconds before voting again.")
     
-    # Check rate limits
-    is_limited, remaining_votes, reset_time = Vote.get_vote_rate_limit_status(voter_ip, fingerprint)
     if is_limited:
         raise ValidationError("Rate limit exceeded. Please try again later.")
     
+    client = cache_redis_client()
+    if settings.VOTEFIGHT_SETTINGS.get('VOTE_BUFFER_ENABLED') and client is not None:
+        return _vote_enqueue(
+            client=client,
+            battle=battle,
+            element=element,
+            user=user,
+            voter_ip=voter_ip,
+            fingerprint=fingerprint,
+            user_agent=user_agent,
+            session_key=session_key
+        )
+    
     with transaction.atomic():
         # Create vote
-        vote = Vote.objects.create(
+        vote = Vote(
             battle=battle,
             element=element,
             user=user,
@@ -80,19 +151,382 @@ def vote_create(
             session_key=session_key
         )
         
-        # Update battle metrics
-        battle.update_metrics()
-        
-        # Update trending score
-        battle.calculate_trending_score()
+        if connection.vendor == 'postgresql':
+            if not _vote_insert_if_open(vote):
+                raise ValidationError("This battle is no longer open for voting.")
+        else:
+            vote.save()
         
-        # Cache vote eligibility
-        cache_key = f"vote_eligibility_{voter_ip}_{fingerprint}_{battle.id}"
-        cache.set(cache_key, False, timeout=3600)  # 1 hour
+        # Vote.save schedules the battle recompute and marks the voter in
+        # the has_user_voted cache on commit
+        battle_id = battle.id
+        element_id = element.id
+        transaction.on_commit(
+            lambda: _vote_counts_incr(battle_id=battle_id, element_id=element_id)
+        )
+        if vote.user_id:
+            user_id = vote.user_id
+            transaction.on_commit(
+                lambda: cache.delete(_user_vote_count_key(user_id))
+            )
         
         return vote
 
 
+def _vote_insert_if_open(vote: Vote) -> bool:
+    """
+    Insert a vote only if its battle is still open, in one statement.
+    
+    INSERT ... SELECT ... WHERE EXISTS decides and writes in a single
+    round trip. Vote.save() side effects and post_save receivers run as
+    they would for a regular save.
+    
+    Args:
+        vote: Unsaved Vote instance
+    
+    Returns:
+        True if the vote was inserted, False if the battle is closed
+    """
+    fields = [field for field in Vote._meta.concrete_fields if not field.primary_key]
+    values = [
+        field.get_db_prep_save(field.pre_save(vote, True), connection)
+        for field in fields
+    ]
+    
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(Vote._meta.db_table)} "
+        f"({', '.join(quote(field.column) for field in fields)}) "
+        f"SELECT {', '.join(['%s'] * len(fields))} "
+        f"WHERE EXISTS ("
+        f"SELECT 1 FROM {quote(Battle._meta.db_table)} "
+        f"WHERE id = %s AND status = %s AND is_active "
+        f"AND (deadline IS NULL OR deadline > now())"
+        f") RETURNING {quote(Vote._meta.pk.column)}"
+    )
+    
+    with connection.cursor() as cursor:
+        cursor.execute(sql, values + [vote.battle_id, BattleStatusChoices.ACTIVE])
+        row = cursor.fetchone()
+    
+    if row is None:
+        return False
+    
+    vote.pk = row[0]
+    vote._state.adding = False
+    vote._state.db = connection.alias
+    
+    vote.update_statistics()
+    transaction.on_commit(vote.mark_voted_cache)
+    post_save.send(
+        sender=Vote, instance=vote, created=True,
+        update_fields=None, raw=False, using=connection.alias
+    )
+    
+    return True
+
+
+def _vote_enqueue(
+    *,
+    client,
+    battle: Battle,
+    element: Element,
+    user: Optional[User],
+    voter_ip: str,
+    fingerprint: str,
+    user_agent: str,
+    session_key: str
+) -> Vote:
+    """
+    Push an already validated vote onto the insert buffer.
+    
+    The voted cache entry is written immediately so repeat attempts
+    are rejected before the buffer is flushed.
+    
+    Args:
+        client: Redis client from cache_redis_client()
+    
+    Returns:
+        Unsaved Vote instance, with the created_at the row will be stored with
+    """
+    from tasks.battle_tasks import flush_vote_buffer
+    
+    vote = Vote(
+        battle=battle,
+        element=element,
+        user=user,
+        voter_ip=voter_ip,
+        fingerprint=fingerprint,
+        user_agent=user_agent,
+        session_key=session_key,
+        created_at=timezone.now()
+    )
+    
+    buffered = client.rpush(cache.make_key(VOTE_BUFFER_KEY), json.dumps({
+        'battle_id': battle.id,
+        'element_id': element.id,
+        'user_id': user.id if user else None,
+        'voter_ip': voter_ip,
+        'fingerprint': fingerprint,
+        'user_agent': user_agent,
+        'session_key': session_key,
+        'created_at': vote.created_at.isoformat(),
+    }))
+    
+    # Flush as soon as a full batch is waiting instead of holding it
+    # until the next periodic flush
+    if buffered % VOTE_BUFFER_BATCH_SIZE == 0:
+        flush_vote_buffer.delay()
+    
+    vote.mark_voted_cache()
+    _vote_counts_incr(battle_id=battle.id, element_id=element.id)
+    
+    return vote
+
+
+def vote_flush_buffer(*, batch_size: int = VOTE_BUFFER_BATCH_SIZE) -> int:
+    """
+    Insert buffered votes in batches.
+    
+    Each batch is moved to a processing list before the INSERT and only
+    removed once the transaction commits, so a failed or interrupted
+    flush leaves it to be retried by the next run. Runs are serialized by
+    a cache lock, which makes the processing list private to the run
+    holding it.
+    
+    Counters are bumped per row by the vote_count_trg trigger.
+    
+    Args:
+        batch_size: Maximum number of votes per INSERT
+    
+    Returns:
+        Number of votes flushed
+    """
+    if not settings.VOTEFIGHT_SETTINGS.get('VOTE_BUFFER_ENABLED'):
+        return 0
+    
+    redis = cache_redis_client()
+    if redis is None:
+        return 0
+    
+    if not cache.add(
+        VOTE_BUFFER_FLUSH_LOCK_KEY,
+        True,
+        timeout=VOTE_BUFFER_FLUSH_LOCK_TIMEOUT
+    ):
+        return 0
+    
+    buffer_key = cache.make_key(VOTE_BUFFER_KEY)
+    processing_key = cache.make_key(VOTE_BUFFER_PROCESSING_KEY)
+    claim = redis_script(redis, LIST_CLAIM_LUA)
+    flushed = 0
+    
+    try:
+        # Votes claimed by an earlier run that did not commit them
+        payloads = redis.lrange(processing_key, 0, -1)
+        if payloads:
+            flushed += _vote_flush_batch(redis, processing_key, payloads, recovered=True)
+        
+        while True:
+            payloads = claim(
+                keys=[buffer_key, processing_key],
+                args=[batch_size],
+                client=redis
+            )
+            if not payloads:
+                break
+            
+            flushed += _vote_flush_batch(redis, processing_key, payloads)
+            if len(payloads) < batch_size:
+                break
+    finally:
+        cache.delete(VOTE_BUFFER_FLUSH_LOCK_KEY)
+    
+    return flushed
+
+
+def _vote_flush_batch(
+    redis,
+    processing_key: str,
+    payloads: List[bytes],
+    *,
+    recovered: bool = False
+) -> int:
+    """
+    Insert one claimed batch and apply the per-vote side effects.
+    
+    Rows whose battle has closed or whose element or user no longer
+    exists are dropped, and their cached voted flag and vote count are
+    reverted. The open battles and their elements are locked for the
+    transaction, so they cannot close or disappear before the INSERT.
+    
+    Rows from a voter (user or IP/fingerprint) who already has a vote in
+    the battle, or an earlier row in the batch, are dropped as well: two
+    devices can both pass the voted check before either is cached.
+    
+    Args:
+        redis: Redis client
+        processing_key: Prefixed processing list key
+        payloads: Claimed payloads, in processing list order
+        recovered: Batch left over by an earlier run; rows matching an
+            existing vote are taken to be its own replayed inserts
+    
+    Returns:
+        Number of votes inserted
+    """
+    from tasks.battle_tasks import schedule_battle_recompute
+    
+    votes = [_vote_from_payload(json.loads(payload)) for payload in payloads]
+    
+    with transaction.atomic():
+        open_battles = set(
+            Battle.objects.select_for_update().filter(
+                id__in={vote.battle_id for vote in votes},
+                status=BattleStatusChoices.ACTIVE,
+                is_active=True
+            ).filter(
+                Q(deadline__isnull=True) | Q(deadline__gt=Now())
+            ).values_list('id', flat=True)
+        )
+        elements = set(
+            Element.objects.select_for_update().filter(
+                id__in={vote.element_id for vote in votes},
+                battle_id__in=open_battles
+            ).values_list('id', 'battle_id')
+        )
+        users = set(
+            User.objects.filter(
+                id__in={vote.user_id for vote in votes if vote.user_id}
+            ).values_list('id', flat=True)
+        )
+        
+        voted = set()
+        for battle_id, voter_ip, fingerprint, user_id in Vote.objects.filter(
+            battle_id__in=open_battles
+        ).filter(
+            Q(
+                voter_ip__in={vote.voter_ip for vote in votes},
+                fingerprint__in={vote.fingerprint for vote in votes}
+            ) |
+            Q(user_id__in=users)
+        ).values_list('battle_id', 'voter_ip', 'fingerprint', 'user_id'):
+            voted.add((battle_id, voter_ip, fingerprint))
+            if user_id:
+                voted.add((battle_id, user_id))
+        
+        accepted, rejected, duplicates = [], [], []
+        for vote in votes:
+            identities = {(vote.battle_id, vote.voter_ip, vote.fingerprint)}
+            if vote.user_id:
+                identities.add((vote.battle_id, vote.user_id))
+            
+            if not (
+                (vote.element_id, vote.battle_id) in elements and
+                (not vote.user_id or vote.user_id in users)
+            ):
+                rejected.append(vote)
+            elif voted & identities:
+                if not recovered:
+                    duplicates.append(vote)
+            else:
+                voted |= identities
+                accepted.append(vote)
+        
+        _vote_bulk_insert(accepted)
+        
+        transaction.on_commit(
+            lambda: redis.ltrim(processing_key, len(payloads), -1)
+        )
+        transaction.on_commit(
+            lambda: _vote_flush_side_effects(
+                accepted=accepted, rejected=rejected, duplicates=duplicates
+            )
+        )
+        for battle_id in {vote.battle_id for vote in accepted}:
+            transaction.on_commit(
+                lambda battle_id=battle_id: schedule_battle_recompute(
+                    battle_id=battle_id
+                )
+            )
+    
+    return len(accepted)
+
+
+def _vote_from_payload(row: Dict[str, Any]) -> Vote:
+    """Build an unsaved Vote from a vote buffer payload."""
+    # Payloads queued before created_at was recorded take the flush time
+    created_at = parse_datetime(row.pop('created_at', '') or '') or timezone.now()
+    return Vote(**row, created_at=created_at, updated_at=created_at)
+
+
+def _vote_bulk_insert(votes: List[Vote]) -> None:
+    """
+    Insert votes with multi-row INSERTs, keeping each vote's created_at.
+    
+    bulk_create would stamp every row with the flush time through
+    auto_now_add, skewing vote velocity and ordering by a flush interval.
+    
+    Args:
+        votes: Unsaved Vote instances with created_at set
+    """
+    if not votes:
+        return
+    
+    fields = [field for field in Vote._meta.concrete_fields if not field.primary_key]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    row_sql = f"({', '.join(['%s'] * len(fields))})"
+    batch_size = connection.ops.bulk_batch_size(fields, votes)
+    
+    with connection.cursor() as cursor:
+        for start in range(0, len(votes), batch_size):
+            batch = votes[start:start + batch_size]
+            cursor.execute(
+                f"INSERT INTO {quote(Vote._meta.db_table)} ({columns}) "
+                f"VALUES {', '.join([row_sql] * len(batch))}",
+                [
+                    field.get_db_prep_save(getattr(vote, field.attname), connection)
+                    for vote in batch
+                    for field in fields
+                ]
+            )
+
+
+def _vote_flush_side_effects(
+    *,
+    accepted: List[Vote],
+    rejected: List[Vote],
+    duplicates: List[Vote]
+) -> None:
+    """
+    Per-vote side effects of a flushed batch, which the raw INSERT skips.
+    
+    Points and streaks are applied once per voter with the batch total,
+    as record_voter_activity does for a single saved vote.
+    
+    Args:
+        accepted: Inserted votes
+        rejected: Dropped votes, already reported as accepted to the voter
+        duplicates: Dropped second votes; the voter's first vote keeps
+            the voted cache entry
+    """
+    for vote in rejected:
+        vote.clear_voted_cache()
+    
+    for vote in rejected + duplicates:
+        _vote_counts_incr(battle_id=vote.battle_id, element_id=vote.element_id, delta=-1)
+    
+    votes_per_user = Counter(vote.user_id for vote in accepted if vote.user_id)
+    if not votes_per_user:
+        return
+    
+    cache.delete_many([_user_vote_count_key(user_id) for user_id in votes_per_user])
+    
+    points = settings.VOTEFIGHT_SETTINGS['VOTE_POINTS']
+    for user in User.objects.filter(id__in=votes_per_user):
+        user.record_vote_activity(points * votes_per_user[user.id])
+
+
 def vote_delete(*, vote: Vote, user: Optional[User] = None) -> bool:
     """
     Delete a vote.
@@ -110,10 +544,15 @@ def vote_delete(*, vote: Vote, user: Optional[User] = None) -> bool:
     
     battle = vote.battle
     vote.delete()
+    vote.clear_voted_cache()
+    _vote_counts_incr(battle_id=battle.id, element_id=vote.element_id, delta=-1)
+    if vote.user_id:
+        cache.delete(_user_vote_count_key(vote.user_id))
     
     # Update battle metrics
-    battle.update_metrics()
-    battle.calculate_trending_score()
+    with battle.flush_pending_updates():
+        battle.update_metrics()
+        calculate_battle_trending_score(battle=battle)
     
     return True
 
@@ -160,8 +599,12 @@ def check_vote_eligibility(
             'message': 'This battle has expired.'
         }
     
+    has_voted, cooldown_remaining, is_limited, remaining_votes, reset_time = (
+        Vote.check_vote_throttles(battle, voter_ip, fingerprint, user)
+    )
+    
     # Check if already voted
-    if Vote.has_user_voted(battle, voter_ip, fingerprint, user):
+    if has_voted:
         return {
             'eligible': False,
             'reason': 'already_voted',
@@ -169,7 +612,6 @@ def check_vote_eligibility(
         }
     
     # Check cooldown
-    cooldown_remaining = Vote.get_vote_cooldown_remaining(voter_ip, fingerprint)
     if cooldown_remaining > 0:
         return {
             'eligible': False,
@@ -179,7 +621,6 @@ def check_vote_eligibility(
         }
     
     # Check rate limits
-    is_limited, remaining_votes, reset_time = Vote.get_vote_rate_limit_status(voter_ip, fingerprint)
     if is_limited:
         return {
             'eligible': False,
@@ -206,18 +647,21 @@ def get_vote_statistics(*, battle: Battle) -> Dict[str, Any]:
     Returns:
         Dictionary with vote statistics
     """
-    elements = battle.elements.all()
-    total_votes = battle.total_votes
-    
-    element_stats = []
-    for element in elements:
-        percentage = (element.vote_count / total_votes * 100) if total_votes > 0 else 0
-        element_stats.append({
-            'id': element.id,
-            'name': element.name,
-            'vote_count': element.vote_count,
-            'percentage': round(percentage, 2)
-        })
+    elements = _element_vote_counts(battle_id=battle.id)
+    total_votes = sum(element['live_votes'] for element in elements)
+    
+    element_stats = [
+        {
+            'id': element['id'],
+            'name': element['name'],
+            'vote_count': element['live_votes'],
+            'percentage': round(
+                element['live_votes'] / total_votes * 100 if total_votes > 0 else 0,
+                2
+            )
+        }
+        for element in elements
+    ]
     
     return {
         'total_votes': total_votes,
@@ -227,6 +671,91 @@ def get_vote_statistics(*, battle: Battle) -> Dict[str, Any]:
     }
 
 
+def _vote_counts_key(battle_id: int) -> str:
+    return cache.make_key(f"battle:counts:{battle_id}")
+
+
+def _vote_counts_incr(*, battle_id: int, element_id: int, delta: int = 1) -> None:
+    """
+    Adjust an element's count in the cached vote counts hash, if cached.
+    
+    Args:
+        battle_id: Battle ID
+        element_id: Element ID
+        delta: Amount to add
+    """
+    client = cache_redis_client()
+    if client is None:
+        return
+    
+    redis_script(client, VOTE_COUNTS_INCR_LUA)(
+        keys=[_vote_counts_key(battle_id)],
+        args=[f"c:{element_id}", delta],
+        client=client
+    )
+
+
+def _element_vote_counts(*, battle_id: int) -> List[Dict[str, Any]]:
+    """
+    Get per-element vote counts, from the Redis hash when populated.
+    
+    The hash holds ``n:<id>`` names, ``o:<id>`` display positions and
+    ``c:<id>`` counts; vote_create and vote_delete adjust counts in
+    place, and a miss is filled from one GROUP BY on the primary, since
+    a lagging replica would hide votes for the life of the hash.
+    
+    Args:
+        battle_id: Battle ID
+    
+    Returns:
+        List of dicts with id, name and live_votes, in display order
+    """
+    client = cache_redis_client()
+    key = _vote_counts_key(battle_id)
+    
+    if client is not None:
+        cached = client.hgetall(key)
+        if cached:
+            fields = {field.decode(): value.decode() for field, value in cached.items()}
+            elements = [
+                {
+                    'id': int(field[2:]),
+                    'name': name,
+                    'live_votes': int(fields.get(f"c:{field[2:]}", 0))
+                }
+                for field, name in fields.items()
+                if field.startswith('n:')
+            ]
+            elements.sort(key=lambda element: int(fields.get(f"o:{element['id']}", 0)))
+            return elements
+    
+    # Live per-element counts in one GROUP BY; the total is summed from
+    # the same rows so percentages always add up
+    elements = list(
+        Element.objects.filter(
+            battle_id=battle_id
+        ).annotate(
+            live_votes=Count('votes')
+        ).order_by('order', 'created_at').values('id', 'name', 'live_votes')
+    )
+    
+    if client is not None and elements:
+        args = [VOTE_COUNTS_TIMEOUT]
+        for position, element in enumerate(elements):
+            args += [
+                f"n:{element['id']}", element['name'],
+                f"o:{element['id']}", position,
+                f"c:{element['id']}", element['live_votes'],
+            ]
+        redis_script(client, VOTE_COUNTS_FILL_LUA)(keys=[key], args=args, client=client)
+    
+    return elements
+
+
+def _user_vote_count_key(user_id: int) -> str:
+    return f"votes:count:{user_id}"
+
+
 def get_user_vote_history(
     *,
     user: User,
@@ -244,24 +773,35 @@ def get_user_vote_history(
     Returns:
         Dictionary with vote history
     """
-    votes = Vote.objects.filter(user=user).select_related(
-        'battle', 'element'
-    ).order_by('-created_at')[offset:offset + limit]
-    
-    vote_history = []
-    for vote in votes:
-        vote_history.append({
-            'id': vote.id,
-            'battle_id': vote.battle.id,
-            'battle_title': vote.battle.title,
-            'element_name': vote.element.name,
-            'voted_at': vote.created_at,
-            'battle_category': vote.battle.category
-        })
+    user_votes = Vote.objects.using(read_replica_alias()).filter(user=user)
+    rows = user_votes.order_by('-created_at').values(
+        'id', 'battle_id', 'battle__title', 'element__name',
+        'created_at', 'battle__category'
+    )[offset:offset + limit]
+    
+    # The total is cached so paging does not rescan every vote of the
+    # user; vote_create and vote_delete invalidate it
+    total_count = cache.get_or_set(
+        _user_vote_count_key(user.id),
+        user_votes.count,
+        USER_VOTE_COUNT_TIMEOUT
+    )
+    
+    vote_history = [
+        {
+            'id': row['id'],
+            'battle_id': row['battle_id'],
+            'battle_title': row['battle__title'],
+            'element_name': row['element__name'],
+            'voted_at': row['created_at'],
+            'battle_category': row['battle__category']
+        }
+        for row in rows
+    ]
     
     return {
         'votes': vote_history,
-        'total_count': Vote.objects.filter(user=user).count(),
+        'total_count': total_count,
         'limit': limit,
         'offset': offset
     }
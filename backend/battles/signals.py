@@ -0,0 +1,123 @@
+"""
+Signal handlers for VoteFight battles.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+
+# Keeps Element.vote_count and Battle.total_votes in step with
+# battles_vote inside the inserting/deleting transaction.
+VOTE_COUNT_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION battles_vote_update_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE battles_element SET vote_count = vote_count + 1
+            WHERE id = NEW.element_id;
+        UPDATE battles_battle SET total_votes = total_votes + 1
+            WHERE id = NEW.battle_id;
+        RETURN NEW;
+    END IF;
+
+    UPDATE battles_element SET vote_count = GREATEST(vote_count - 1, 0)
+        WHERE id = OLD.element_id;
+    UPDATE battles_battle SET total_votes = GREATEST(total_votes - 1, 0)
+        WHERE id = OLD.battle_id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS vote_count_trg ON battles_vote;
+CREATE TRIGGER vote_count_trg
+    AFTER INSERT OR DELETE ON battles_vote
+    FOR EACH ROW EXECUTE FUNCTION battles_vote_update_counts();
+"""
+
+
+# Builds Battle.search_vector in the same statement as the INSERT/UPDATE,
+# then backfills rows written before the trigger existed.
+SEARCH_VECTOR_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION battles_battle_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('{config}', COALESCE(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('{config}', COALESCE(NEW.description, '')), 'B');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS battle_search_vector_trg ON battles_battle;
+CREATE TRIGGER battle_search_vector_trg
+    BEFORE INSERT OR UPDATE OF title, description, search_vector ON battles_battle
+    FOR EACH ROW EXECUTE FUNCTION battles_battle_search_vector();
+
+-- Assigning the column fires the trigger for rows never indexed
+UPDATE battles_battle SET search_vector = NULL WHERE search_vector IS NULL;
+"""
+
+
+def install_vote_count_trigger(sender, using, **kwargs):
+    """
+    Install the vote counter trigger after migrations.
+    
+    Only PostgreSQL is supported; on other backends the counters are
+    reconciled by the recompute_battle task.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    
+    with connection.cursor() as cursor:
+        cursor.execute(VOTE_COUNT_TRIGGER_SQL)
+
+
+def install_search_vector_trigger(sender, using, **kwargs):
+    """
+    Install the battle search vector trigger after migrations.
+    
+    Only PostgreSQL is supported; other backends have no full-text
+    search and leave search_vector empty.
+    """
+    from .models import Battle
+    
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_VECTOR_TRIGGER_SQL.format(config=Battle.SEARCH_CONFIG))
+
+
+def record_voter_activity(sender, instance, created, **kwargs):
+    """
+    Award points and advance the streak of an authenticated voter once
+    the vote commits.
+    """
+    if not created or not instance.user_id:
+        return
+    
+    user_id = instance.user_id
+    points = settings.VOTEFIGHT_SETTINGS['VOTE_POINTS']
+    
+    def record():
+        user = get_user_model().objects.filter(pk=user_id).first()
+        if user is not None:
+            user.record_vote_activity(points)
+    
+    transaction.on_commit(record)
+
+
+def schedule_battle_score_on_create(sender, instance, created, **kwargs):
+    """
+    Recompute the trending score of the battle a new like, share or
+    comment belongs to, once the surrounding transaction commits. Votes
+    schedule the same recompute from Vote.update_statistics().
+    """
+    if not created:
+        return
+    
+    from tasks.battle_tasks import schedule_battle_recompute
+    
+    battle_id = instance.battle_id
+    transaction.on_commit(
+        lambda: schedule_battle_recompute(battle_id=battle_id)
+    )
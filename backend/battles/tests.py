@@ -1,3 +1,328 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from utils.ratelimit import guarded_take
+from .models import Battle, Element, Vote
+from .models.choices import BattleStatusChoices
+from .selectors.vote_selectors import vote_cursor, vote_list
+from .services.vote_services import (
+    _vote_flush_batch,
+    get_vote_statistics,
+    vote_create,
+    vote_flush_buffer,
+)
+
+User = get_user_model()
+
+# Exercise the non-Redis fallbacks
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+def create_battle(*, title='Cats vs Dogs', elements=('Cats', 'Dogs')):
+    """Create an active battle with one element per name, in display order."""
+    creator, _ = User.objects.get_or_create(
+        username='creator',
+        defaults={'email': 'creator@example.com'}
+    )
+    battle = Battle.objects.create(creator=creator, title=title)
+    for order, name in enumerate(elements):
+        Element.objects.create(battle=battle, name=name, order=order)
+    return battle
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GuardedTakeTests(TestCase):
+    """guarded_take through the non-atomic cache fallback."""
+
+    def setUp(self):
+        cache.clear()
+
+    def take(self, **kwargs):
+        return guarded_take(
+            'flag', 'bucket', 'window',
+            capacity=1, refill_per_second=1 / 60, limit=2, window_seconds=300,
+            **kwargs
+        )
+
+    def test_flag_set_consumes_nothing(self):
+        cache.set('flag', 1)
+
+        flag, wait_seconds, allowed, remaining, _ = self.take()
+
+        self.assertEqual(flag, 1)
+        self.assertEqual(wait_seconds, 0)
+        self.assertTrue(allowed)
+        self.assertEqual(remaining, 2)
+
+    def test_unset_flag_without_override_consumes_nothing(self):
+        flag, _, _, remaining, _ = self.take()
+
+        self.assertIsNone(flag)
+        self.assertEqual(remaining, 2)
+        self.assertEqual(self.take(flag=0)[1], 0)
+
+    def test_take_consumes_token_and_window_hit(self):
+        flag, wait_seconds, allowed, remaining, _ = self.take(flag=0)
+
+        self.assertEqual(flag, 0)
+        self.assertEqual(wait_seconds, 0)
+        self.assertTrue(allowed)
+        self.assertEqual(remaining, 1)
+
+    def test_cooldown_rejection_keeps_window_hits(self):
+        self.take(flag=0)
+
+        _, wait_seconds, _, remaining, _ = self.take(flag=0)
+
+        self.assertGreater(wait_seconds, 0)
+        self.assertEqual(remaining, 1)
+
+    def test_peek_consumes_nothing(self):
+        self.take(flag=0, consume=False)
+
+        self.assertEqual(self.take(flag=0, consume=False)[3], 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class VoteThrottleTests(TestCase):
+    """Vote.check_vote_throttles and the vote_create precheck."""
+
+    def setUp(self):
+        cache.clear()
+        self.battle = create_battle()
+        self.element = self.battle.elements.first()
+
+    def test_repeat_vote_does_not_consume_cooldown(self):
+        Vote.objects.create(
+            battle=self.battle, element=self.element,
+            voter_ip='10.0.0.1', fingerprint='fp'
+        )
+
+        has_voted, _, _, _, _ = Vote.check_vote_throttles(
+            self.battle, '10.0.0.1', 'fp', consume=True
+        )
+        _, cooldown, is_limited, remaining, _ = Vote.check_vote_throttles(
+            self.battle, '10.0.0.1', 'fp'
+        )
+
+        self.assertTrue(has_voted)
+        self.assertEqual(cooldown, 0)
+        self.assertFalse(is_limited)
+        self.assertEqual(remaining, Vote.MAX_VOTES_PER_WINDOW)
+
+    def test_vote_starts_cooldown(self):
+        vote_create(
+            battle=self.battle, element=self.element,
+            voter_ip='10.0.0.1', fingerprint='fp'
+        )
+        other = create_battle(title='Tea vs Coffee', elements=('Tea', 'Coffee'))
+
+        has_voted, cooldown, _, remaining, _ = Vote.check_vote_throttles(
+            other, '10.0.0.1', 'fp'
+        )
+
+        self.assertFalse(has_voted)
+        self.assertGreater(cooldown, 0)
+        self.assertEqual(remaining, Vote.MAX_VOTES_PER_WINDOW - 1)
+
+    def test_second_vote_rejected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            vote_create(
+                battle=self.battle, element=self.element,
+                voter_ip='10.0.0.1', fingerprint='fp'
+            )
+
+        with self.assertRaisesMessage(ValidationError, 'already voted'):
+            vote_create(
+                battle=self.battle, element=self.element,
+                voter_ip='10.0.0.1', fingerprint='fp'
+            )
+
+        self.assertEqual(Vote.objects.filter(battle=self.battle).count(), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class VoteFlushBatchTests(TestCase):
+    """Inserting claimed vote buffer batches."""
+
+    def setUp(self):
+        cache.clear()
+        self.battle = create_battle()
+        self.element = self.battle.elements.first()
+        self.redis = mock.Mock()
+
+    def payload(self, voter_ip, *, element=None, created_at=None):
+        return json.dumps({
+            'battle_id': self.battle.id,
+            'element_id': (element or self.element).id,
+            'user_id': None,
+            'voter_ip': voter_ip,
+            'fingerprint': 'fp',
+            'user_agent': '',
+            'session_key': '',
+            'created_at': (created_at or timezone.now()).isoformat(),
+        }).encode()
+
+    def flush(self, payloads, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return _vote_flush_batch(self.redis, 'processing', payloads, **kwargs)
+
+    def test_keeps_vote_timestamp(self):
+        created_at = timezone.now() - timedelta(minutes=5)
+
+        self.assertEqual(self.flush([self.payload('10.0.0.1', created_at=created_at)]), 1)
+
+        self.assertEqual(Vote.objects.get(battle=self.battle).created_at, created_at)
+        self.redis.ltrim.assert_called_once_with('processing', 1, -1)
+
+    def test_drops_duplicates(self):
+        Vote.objects.create(
+            battle=self.battle, element=self.element,
+            voter_ip='10.0.0.1', fingerprint='fp'
+        )
+
+        flushed = self.flush([
+            self.payload('10.0.0.1'),
+            self.payload('10.0.0.2'),
+            self.payload('10.0.0.2'),
+        ])
+
+        self.assertEqual(flushed, 1)
+        self.assertEqual(Vote.objects.filter(battle=self.battle).count(), 2)
+        self.redis.ltrim.assert_called_once_with('processing', 3, -1)
+
+    def test_recovered_batch_is_not_inserted_twice(self):
+        payloads = [self.payload('10.0.0.1'), self.payload('10.0.0.2')]
+        self.flush(payloads[:1])
+
+        self.assertEqual(self.flush(payloads, recovered=True), 1)
+
+        self.assertEqual(Vote.objects.filter(battle=self.battle).count(), 2)
+
+    def test_rejects_closed_battle_and_clears_voted_cache(self):
+        Battle.objects.filter(pk=self.battle.pk).update(
+            status=BattleStatusChoices.EXPIRED
+        )
+        vote = Vote(battle=self.battle, voter_ip='10.0.0.1', fingerprint='fp')
+        vote.mark_voted_cache()
+
+        self.assertEqual(self.flush([self.payload('10.0.0.1')]), 0)
+
+        self.assertFalse(Vote.objects.exists())
+        self.assertIsNone(cache.get(Vote.voted_cache_key(
+            self.battle.id, voter_ip='10.0.0.1', fingerprint='fp'
+        )))
+
+    @override_settings(
+        VOTEFIGHT_SETTINGS={**settings.VOTEFIGHT_SETTINGS, 'VOTE_BUFFER_ENABLED': True}
+    )
+    def test_flush_needs_redis(self):
+        self.assertEqual(vote_flush_buffer(), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class VoteStatisticsTests(TestCase):
+    """Live vote statistics."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_elements_in_display_order(self):
+        battle = create_battle(elements=('Cats', 'Dogs', 'Birds'))
+        birds = battle.elements.get(name='Birds')
+        Element.objects.filter(pk=birds.pk).update(order=0)
+        Element.objects.exclude(pk=birds.pk).filter(battle=battle).update(order=1)
+        for n in range(3):
+            Vote.objects.create(
+                battle=battle, element=birds,
+                voter_ip=f'10.0.0.{n}', fingerprint='fp'
+            )
+
+        stats = get_vote_statistics(battle=battle)
+
+        self.assertEqual(
+            [element['name'] for element in stats['elements']],
+            ['Birds', 'Cats', 'Dogs']
+        )
+        self.assertEqual(stats['total_votes'], 3)
+        self.assertEqual(stats['elements'][0]['percentage'], 100)
+
+
+class VoteCursorPaginationTests(TestCase):
+    """Keyset pagination of vote lists."""
+
+    def setUp(self):
+        self.battle = create_battle()
+        element = self.battle.elements.first()
+        for n in range(5):
+            Vote.objects.create(
+                battle=self.battle, element=element,
+                voter_ip=f'10.0.0.{n}', fingerprint='fp'
+            )
+        # Ties on created_at are broken by id
+        Vote.objects.filter(battle=self.battle).update(created_at=timezone.now())
+
+    def test_pages_cover_every_vote_once(self):
+        seen, cursor = [], None
+        while True:
+            page = vote_list(battle_id=self.battle.id, limit=2, cursor=cursor)
+            if not page:
+                break
+            seen += [vote.id for vote in page]
+            cursor = vote_cursor(page[-1])
+
+        self.assertEqual(
+            seen,
+            list(Vote.objects.filter(battle=self.battle).order_by('-id').values_list('id', flat=True))
+        )
+
+    def test_cursor_matches_offset(self):
+        first = vote_list(battle_id=self.battle.id, limit=2)
+
+        self.assertEqual(
+            vote_list(battle_id=self.battle.id, limit=2, cursor=vote_cursor(first[-1])),
+            vote_list(battle_id=self.battle.id, limit=2, offset=2)
+        )
+
+
+class FlushPendingUpdatesTests(TestCase):
+    """Battle.flush_pending_updates coalescing partial saves."""
+
+    def setUp(self):
+        self.battle = create_battle()
+
+    def test_partial_saves_share_one_update(self):
+        with self.assertNumQueries(1):
+            with self.battle.flush_pending_updates():
+                self.battle.likes_count = 3
+                self.battle.save(update_fields=['likes_count'])
+                self.battle.trending_score = 1.5
+                self.battle.save(update_fields=['trending_score'])
+
+        self.battle.refresh_from_db()
+        self.assertEqual((self.battle.likes_count, self.battle.trending_score), (3, 1.5))
+
+    def test_nothing_written_when_block_raises(self):
+        with self.assertRaises(RuntimeError):
+            with self.battle.flush_pending_updates():
+                self.battle.likes_count = 3
+                self.battle.save(update_fields=['likes_count'])
+                raise RuntimeError
+
+        self.battle.refresh_from_db()
+        self.assertEqual(self.battle.likes_count, 0)
+        # Saves after the block write through again
+        self.battle.likes_count = 1
+        self.battle.save(update_fields=['likes_count'])
+        self.battle.refresh_from_db()
+        self.assertEqual(self.battle.likes_count, 1)
@@ -0,0 +1,130 @@
+"""
+Battle background tasks for VoteFight application.
+Following Django Styleguide patterns.
+"""
+from celery import shared_task
+from django.core.cache import cache
+from django.db import connection
+
+from battles.models import Battle, Element, Vote
+from battles.services.battle_services import (
+    battle_build_trending_index,
+    battle_flush_view_counts,
+    battle_reconcile_metrics,
+)
+from battles.services.trending_services import (
+    calculate_battle_trending_score,
+    update_trending_scores,
+)
+from battles.services.vote_services import vote_flush_buffer
+from utils.helpers import subquery_count
+
+# Votes and engagement events within this window share a single
+# per-battle recompute
+BATTLE_RECOMPUTE_DEBOUNCE_SECONDS = 5
+
+
+def _battle_recompute_lock_key(battle_id: int) -> str:
+    return f"battle_recompute_lock_{battle_id}"
+
+
+def schedule_battle_recompute(*, battle_id: int) -> bool:
+    """
+    Enqueue a per-battle recompute unless one is already pending.
+    
+    Args:
+        battle_id: Battle that received a vote, like, share or comment
+    
+    Returns:
+        True if a new task was enqueued
+    """
+    if not cache.add(
+        _battle_recompute_lock_key(battle_id),
+        True,
+        timeout=BATTLE_RECOMPUTE_DEBOUNCE_SECONDS
+    ):
+        return False
+    
+    recompute_battle.apply_async(
+        args=[battle_id],
+        countdown=BATTLE_RECOMPUTE_DEBOUNCE_SECONDS
+    )
+    return True
+
+
+@shared_task
+def recompute_battle(battle_id: int) -> None:
+    """
+    Refresh vote percentages and the trending score of a battle.
+    
+    Vote counters are kept by the vote_count_trg trigger and engagement
+    counters by F() updates, so they are not recounted here; only on
+    backends without the trigger are vote counters recounted.
+    
+    Args:
+        battle_id: Battle to recompute
+    """
+    # Release the debounce lock first so events landing during the
+    # recompute schedule a follow-up run.
+    cache.delete(_battle_recompute_lock_key(battle_id))
+    
+    if connection.vendor != 'postgresql':
+        Element.objects.filter(battle_id=battle_id).update(
+            vote_count=subquery_count(Vote.objects.all(), outer_field='element')
+        )
+        Battle.objects.filter(pk=battle_id).update(
+            total_votes=subquery_count(Vote.objects.all())
+        )
+    
+    Element.refresh_vote_percentages(battle_id=battle_id)
+    
+    battle = Battle.objects.filter(pk=battle_id).first()
+    if battle is not None:
+        calculate_battle_trending_score(battle=battle)
+
+
+@shared_task
+def recompute_trending_scores() -> int:
+    """
+    Periodically recompute trending scores for all active battles
+    and rebuild the cached trending index.
+    
+    Returns:
+        Number of battles updated
+    """
+    updated = update_trending_scores()['updated_battles']
+    battle_build_trending_index()
+    return updated
+
+
+@shared_task
+def reconcile_battle_metrics() -> int:
+    """
+    Periodically recount likes, shares and comments for active battles.
+    
+    Returns:
+        Number of battles updated
+    """
+    return battle_reconcile_metrics()
+
+
+@shared_task
+def flush_view_counts() -> int:
+    """
+    Periodically flush cached battle view counters to the database.
+    
+    Returns:
+        Number of views flushed
+    """
+    return battle_flush_view_counts()
+
+
+@shared_task
+def flush_vote_buffer() -> int:
+    """
+    Periodically insert buffered votes.
+    
+    Returns:
+        Number of votes flushed
+    """
+    return vote_flush_buffer()
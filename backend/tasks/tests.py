@@ -1,3 +1,72 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from battles.models import Battle, Element, Vote
+from .battle_tasks import (
+    flush_view_counts,
+    flush_vote_buffer,
+    recompute_battle,
+    schedule_battle_recompute,
+)
+from .user_tasks import flush_notifications
+
+User = get_user_model()
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BattleRecomputeTests(TestCase):
+    """Debounced per-battle recompute."""
+
+    def setUp(self):
+        cache.clear()
+        creator = User.objects.create(username='creator', email='creator@example.com')
+        self.battle = Battle.objects.create(creator=creator, title='Cats vs Dogs')
+        self.cats = Element.objects.create(battle=self.battle, name='Cats', order=0)
+        self.dogs = Element.objects.create(battle=self.battle, name='Dogs', order=1)
+
+    def test_schedule_is_debounced(self):
+        with mock.patch.object(recompute_battle, 'apply_async') as apply_async:
+            self.assertTrue(schedule_battle_recompute(battle_id=self.battle.id))
+            self.assertFalse(schedule_battle_recompute(battle_id=self.battle.id))
+
+        apply_async.assert_called_once()
+
+    def test_recompute_releases_debounce(self):
+        with mock.patch.object(recompute_battle, 'apply_async'):
+            schedule_battle_recompute(battle_id=self.battle.id)
+            recompute_battle(self.battle.id)
+
+            self.assertTrue(schedule_battle_recompute(battle_id=self.battle.id))
+
+    def test_recompute_refreshes_counts_and_percentages(self):
+        for n, element in enumerate([self.cats, self.cats, self.cats, self.dogs]):
+            Vote.objects.create(
+                battle=self.battle, element=element,
+                voter_ip=f'10.0.0.{n}', fingerprint='fp'
+            )
+
+        recompute_battle(self.battle.id)
+
+        self.battle.refresh_from_db()
+        self.cats.refresh_from_db()
+        self.dogs.refresh_from_db()
+        self.assertEqual(self.battle.total_votes, 4)
+        self.assertEqual((self.cats.vote_count, self.dogs.vote_count), (3, 1))
+        self.assertEqual((self.cats.vote_percentage, self.dogs.vote_percentage), (75, 25))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BufferFlushTaskTests(TestCase):
+    """Buffer flushes are no-ops without the Redis cache backend."""
+
+    def test_flushes_without_redis(self):
+        self.assertEqual(flush_vote_buffer(), 0)
+        self.assertEqual(flush_view_counts(), 0)
+        self.assertEqual(flush_notifications(), 0)
@@ -0,0 +1,32 @@
+"""
+User background tasks for VoteFight application.
+Following Django Styleguide patterns.
+"""
+from celery import shared_task
+from django.contrib.auth import get_user_model
+
+from users.services import notification_flush_buffer
+
+User = get_user_model()
+
+
+@shared_task
+def flush_last_active() -> int:
+    """
+    Periodically write cached last_active timestamps to the database.
+    
+    Returns:
+        Number of users updated
+    """
+    return User.flush_last_active()
+
+
+@shared_task
+def flush_notifications() -> int:
+    """
+    Periodically insert queued notifications.
+    
+    Returns:
+        Number of notifications flushed
+    """
+    return notification_flush_buffer()
@@ -1,13 +1,14 @@
 """
 User models for VoteFight application.
 """
-from .user import User, UserProfile, UserFollow
+from .user import User, UserProfile, UserFollow, UserNotification
 from .choices import UserRoleChoices, NotificationTypeChoices
 
 __all__ = [
     'User',
     'UserProfile', 
     'UserFollow',
+    'UserNotification',
     'UserRoleChoices',
     'NotificationTypeChoices',
 ]
@@ -2,10 +2,10 @@
 User models for VoteFight application.
 """
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
+from django.db.models.functions import Greatest
 from django.utils import timezone
-from django.core.validators import RegexValidator
-from django.core.exceptions import ValidationError
 
 from utils.models import BaseModel, TimestampedModel
 from .choices import UserRoleChoices, NotificationTypeChoices
@@ -16,16 +16,8 @@ class User(AbstractUser):
     Extended User model with VoteFight-specific fields.
     """
     email = models.EmailField(unique=True)
-    username = models.CharField(
-        max_length=30,
-        unique=True,
-        validators=[
-            RegexValidator(
-                regex=r'^[a-zA-Z0-9_]+$',
-                message='Username can only contain letters, numbers, and underscores.'
-            )
-        ]
-    )
+    # Allowed characters are enforced by the username_charset constraint
+    username = models.CharField(max_length=30, unique=True)
     role = models.CharField(
         max_length=20,
         choices=UserRoleChoices.choices,
@@ -45,12 +37,22 @@ class User(AbstractUser):
     streak_days = models.PositiveIntegerField(default=0)
     last_streak_date = models.DateField(null=True, blank=True)
     
+    # Pending last_active timestamps are kept in the cache this long
+    LAST_ACTIVE_CACHE_TIMEOUT = 3600
+    
     USERNAME_FIELD = 'username'
     EMAIL_FIELD = 'email'
     REQUIRED_FIELDS = ['email']
     
     class Meta:
         db_table = 'users_user'
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(username__regex=r'^[a-zA-Z0-9_]+$'),
+                name='username_charset',
+                violation_error_message='Username can only contain letters, numbers, and underscores.'
+            ),
+        ]
         verbose_name = 'User'
         verbose_name_plural = 'Users'
     
@@ -68,9 +70,60 @@ class User(AbstractUser):
         return None
     
     def update_last_active(self):
-        """Update user's last active timestamp."""
+        """
+        Update user's last active timestamp.
+        On Redis the write is deferred to flush_last_active(); other cache
+        backends cannot enumerate pending keys, so they write through.
+        """
         self.last_active = timezone.now()
-        self.save(update_fields=['last_active'])
+        
+        if not hasattr(cache, 'iter_keys'):
+            self.save(update_fields=['last_active'])
+            return
+        
+        cache.set(
+            self.last_active_cache_key(self.id),
+            self.last_active,
+            timeout=self.LAST_ACTIVE_CACHE_TIMEOUT
+        )
+    
+    @staticmethod
+    def last_active_cache_key(user_id):
+        """Cache key holding a user's pending last_active timestamp."""
+        return f"ua:{user_id}"
+    
+    @classmethod
+    def flush_last_active(cls, batch_size=5000):
+        """
+        Write pending last_active timestamps with batched UPDATEs.
+        Returns the number of users updated.
+        """
+        if not hasattr(cache, 'iter_keys'):
+            return 0
+        
+        flushed = 0
+        keys = []
+        for key in cache.iter_keys(cls.last_active_cache_key('*')):
+            keys.append(key)
+            if len(keys) == batch_size:
+                flushed += cls._flush_last_active_batch(keys)
+                keys = []
+        
+        if keys:
+            flushed += cls._flush_last_active_batch(keys)
+        
+        return flushed
+    
+    @classmethod
+    def _flush_last_active_batch(cls, keys):
+        pending = cache.get_many(keys)
+        users = [
+            cls(pk=int(key.split(':', 1)[1]), last_active=last_active)
+            for key, last_active in pending.items()
+        ]
+        cls.objects.bulk_update(users, ['last_active'], batch_size=len(keys))
+        cache.delete_many(list(pending))
+        return len(users)
     
     def add_points(self, points: int):
         """Add points to user and update level."""
@@ -85,8 +138,10 @@ class User(AbstractUser):
     
     def update_streak(self):
         """Update user's daily streak."""
-        today = timezone.now().date()
-        
+        self._advance_streak(timezone.now().date())
+        self.save(update_fields=['streak_days', 'last_streak_date'])
+    
+    def _advance_streak(self, today):
         if self.last_streak_date:
             if (today - self.last_streak_date).days == 1:
                 # Consecutive day
@@ -99,7 +154,34 @@ class User(AbstractUser):
             self.streak_days = 1
         
         self.last_streak_date = today
-        self.save(update_fields=['streak_days', 'last_streak_date'])
+    
+    def record_vote_activity(self, points_delta: int):
+        """
+        Apply the points, streak and last_active updates for a vote in a
+        single UPDATE instead of one per field group.
+        
+        Points and level are computed in the database so concurrent votes
+        by the same user don't overwrite each other's increments; the
+        streak only depends on the date, so it is safe to set from here.
+        """
+        now = timezone.now()
+        points = models.F('points') + points_delta
+        
+        self._advance_streak(now.date())
+        self.last_active = now
+        
+        User.objects.filter(pk=self.pk).update(
+            points=points,
+            # Same formula as calculate_level
+            level=Greatest(points / 100 + 1, 1),
+            streak_days=self.streak_days,
+            last_streak_date=self.last_streak_date,
+            last_active=now
+        )
+        self.refresh_from_db(fields=['points', 'level'])
+        
+        # A pending cached timestamp is older; don't let the flush roll it back
+        cache.delete(self.last_active_cache_key(self.id))
 
 
 class UserProfile(TimestampedModel):
@@ -175,17 +257,18 @@ class UserFollow(TimestampedModel):
     class Meta:
         db_table = 'users_follow'
         unique_together = ['follower', 'following']
+        constraints = [
+            models.CheckConstraint(
+                check=~models.Q(follower=models.F('following')),
+                name='no_self_follow',
+                violation_error_message='Users cannot follow themselves.'
+            ),
+        ]
         verbose_name = 'User Follow'
         verbose_name_plural = 'User Follows'
     
     def __str__(self):
         return f"{self.follower.username} follows {self.following.username}"
-    
-    def clean(self):
-        """Validate follow relationship."""
-        super().clean()
-        if self.follower == self.following:
-            raise ValidationError("Users cannot follow themselves.")
 
 
 class UserNotification(TimestampedModel):
@@ -0,0 +1,14 @@
+"""
+User services for VoteFight application.
+"""
+from .notification_services import (
+    notification_bulk_create,
+    notification_enqueue,
+    notification_flush_buffer,
+)
+
+__all__ = [
+    'notification_bulk_create',
+    'notification_enqueue',
+    'notification_flush_buffer',
+]
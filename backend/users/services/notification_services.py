@@ -0,0 +1,139 @@
+"""
+Notification service functions for VoteFight application.
+Following Django Styleguide patterns.
+"""
+import json
+from typing import Any, Dict, List
+
+from django.core.cache import cache
+from django.db import transaction
+
+from utils.helpers import LIST_CLAIM_LUA, cache_redis_client, redis_script
+from ..models import UserNotification
+
+# Redis list holding notifications accepted but not yet inserted
+NOTIFICATION_BUFFER_KEY = 'notification_buffer'
+NOTIFICATION_BATCH_SIZE = 500
+
+# Batch being inserted; removed only after its transaction commits
+NOTIFICATION_PROCESSING_KEY = 'notification_buffer:processing'
+
+# One flush at a time; must outlast a flush of the whole buffer
+NOTIFICATION_FLUSH_LOCK_KEY = 'notification_flush_lock'
+NOTIFICATION_FLUSH_LOCK_TIMEOUT = 300
+
+
+def notification_bulk_create(
+    *,
+    notifications: List[UserNotification]
+) -> List[UserNotification]:
+    """
+    Insert notifications in batched INSERTs.
+    
+    Rows are not validated individually; callers build them from trusted
+    data (fan-out to followers, trending alerts).
+    
+    Args:
+        notifications: Unsaved UserNotification instances
+    
+    Returns:
+        The notifications passed in
+    """
+    return UserNotification.objects.bulk_create(
+        notifications,
+        batch_size=NOTIFICATION_BATCH_SIZE
+    )
+
+
+def notification_enqueue(*, notifications: List[Dict[str, Any]]) -> None:
+    """
+    Queue per-recipient notifications for the periodic batch insert.
+    
+    Each dict holds UserNotification field values by attribute name
+    (user_id, notification_type, title, message, battle_id, from_user_id).
+    Without the Redis cache backend they are inserted immediately.
+    
+    Args:
+        notifications: Notification field dicts
+    """
+    if not notifications:
+        return
+    
+    client = cache_redis_client()
+    if client is None:
+        notification_bulk_create(notifications=[
+            UserNotification(**fields) for fields in notifications
+        ])
+        return
+    
+    client.rpush(
+        cache.make_key(NOTIFICATION_BUFFER_KEY),
+        *[json.dumps(fields) for fields in notifications]
+    )
+
+
+def notification_flush_buffer(*, batch_size: int = NOTIFICATION_BATCH_SIZE) -> int:
+    """
+    Insert queued notifications in batches.
+    
+    Each batch is moved to a processing list before the INSERT and only
+    removed once the transaction commits; a batch left there by a failed
+    run is inserted first by the next one. Runs are serialized by a cache
+    lock.
+    
+    Args:
+        batch_size: Maximum number of notifications per INSERT
+    
+    Returns:
+        Number of notifications flushed
+    """
+    client = cache_redis_client()
+    if client is None:
+        return 0
+    
+    if not cache.add(
+        NOTIFICATION_FLUSH_LOCK_KEY,
+        True,
+        timeout=NOTIFICATION_FLUSH_LOCK_TIMEOUT
+    ):
+        return 0
+    
+    buffer_key = cache.make_key(NOTIFICATION_BUFFER_KEY)
+    processing_key = cache.make_key(NOTIFICATION_PROCESSING_KEY)
+    claim = redis_script(client, LIST_CLAIM_LUA)
+    flushed = 0
+    
+    try:
+        # Notifications claimed by an earlier run that did not commit them
+        payloads = client.lrange(processing_key, 0, -1)
+        if payloads:
+            flushed += _notification_flush_batch(client, processing_key, payloads)
+        
+        while True:
+            payloads = claim(
+                keys=[buffer_key, processing_key],
+                args=[batch_size],
+                client=client
+            )
+            if not payloads:
+                break
+            
+            flushed += _notification_flush_batch(client, processing_key, payloads)
+            if len(payloads) < batch_size:
+                break
+    finally:
+        cache.delete(NOTIFICATION_FLUSH_LOCK_KEY)
+    
+    return flushed
+
+
+def _notification_flush_batch(client, processing_key: str, payloads: List[bytes]) -> int:
+    with transaction.atomic():
+        notification_bulk_create(notifications=[
+            UserNotification(**json.loads(payload)) for payload in payloads
+        ])
+        transaction.on_commit(
+            lambda: client.ltrim(processing_key, len(payloads), -1)
+        )
+    
+    return len(payloads)
@@ -1,3 +1,45 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import User
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RecordVoteActivityTests(TestCase):
+    """User.record_vote_activity."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='voter', email='voter@example.com')
+
+    def test_stale_instances_keep_both_increments(self):
+        other = User.objects.get(pk=self.user.pk)
+
+        self.user.record_vote_activity(60)
+        other.record_vote_activity(60)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.points, 120)
+        self.assertEqual(self.user.level, 2)
+        self.assertEqual(other.points, 120)
+
+    def test_streak_advances_once_per_day(self):
+        yesterday = timezone.now().date() - timedelta(days=1)
+        User.objects.filter(pk=self.user.pk).update(
+            streak_days=3, last_streak_date=yesterday
+        )
+        self.user.refresh_from_db()
+
+        self.user.record_vote_activity(1)
+        self.user.record_vote_activity(1)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.streak_days, 4)
+        self.assertEqual(self.user.last_streak_date, timezone.now().date())
@@ -0,0 +1,73 @@
+"""
+Shared helpers for VoteFight application.
+"""
+from django.db.models import Count, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+
+
+def subquery_count(queryset: QuerySet, *, outer_field: str = 'battle') -> Coalesce:
+    """
+    Build a correlated COUNT(*) subquery for use in annotate() or update().
+
+    Counting through a scalar subquery keeps the outer query at one row per
+    parent instead of joining (and multiplying) the related rows.
+
+    Args:
+        queryset: Related rows to count
+        outer_field: Field on the related model pointing at the outer row
+
+    Returns:
+        Expression evaluating to the related row count (0 when empty)
+    """
+    counts = queryset.filter(
+        **{outer_field: OuterRef('pk')}
+    ).order_by().values(outer_field).annotate(
+        count=Count('pk')
+    ).values('count')
+    
+    return Coalesce(Subquery(counts[:1]), 0)
+
+
+_redis_scripts = {}
+
+# Move up to ARGV[1] items from the head of KEYS[1] to a processing list
+# KEYS[2] and return them; buffers remove them from the processing list
+# once they are stored
+LIST_CLAIM_LUA = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items > 0 then
+    redis.call('LTRIM', KEYS[1], #items, -1)
+    redis.call('RPUSH', KEYS[2], unpack(items))
+end
+return items
+"""
+
+
+def cache_redis_client():
+    """
+    Return the raw Redis client behind the default cache.
+
+    Returns:
+        Redis client, or None when the cache is not django-redis
+    """
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def redis_script(client, source: str):
+    """
+    Register a Lua script once per process; calls use EVALSHA.
+
+    Args:
+        client: Redis client from cache_redis_client()
+        source: Lua source
+
+    Returns:
+        Callable redis-py Script
+    """
+    if source not in _redis_scripts:
+        _redis_scripts[source] = client.register_script(source)
+    return _redis_scripts[source]
@@ -22,11 +22,6 @@ class BaseModel(models.Model):
         """Override clean method for validation."""
         super().clean()
         # Add common validation logic here
-    
-    def save(self, *args, **kwargs):
-        """Override save method to call full_clean."""
-        self.full_clean()
-        super().save(*args, **kwargs)
 
 
 class TimestampedModel(BaseModel):
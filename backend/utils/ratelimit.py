@@ -0,0 +1,341 @@
+"""
+Atomic rate limiting helpers for VoteFight application.
+
+On the Redis cache backend each check runs as a single Lua script, so the
+decision and the bookkeeping happen in one round trip without races. Other
+cache backends (e.g. locmem in development) use a non-atomic fallback.
+"""
+import math
+import time
+import uuid
+from typing import Optional, Tuple
+
+from django.core.cache import cache
+
+from utils.helpers import cache_redis_client, redis_script
+
+# Sliding-window log: one sorted-set member per hit, scored by time.
+# KEYS[1] = window key
+# ARGV = now, window_seconds, limit, consume (0/1), member
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local allowed = count < limit
+
+if allowed and ARGV[4] == '1' then
+    redis.call('ZADD', key, now, ARGV[5])
+    redis.call('PEXPIRE', key, math.ceil(window * 1000))
+    count = count + 1
+end
+
+local reset = now + window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window
+end
+
+return {allowed and 1 or 0, math.max(limit - count, 0), tostring(reset)}
+"""
+
+# Token bucket stored as a hash of (tokens, ts), refilled lazily.
+# KEYS[1] = bucket key
+# ARGV = now, capacity, refill_per_second, consume (0/1)
+TOKEN_BUCKET_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+if tokens < 1 then
+    return {0, tostring((1 - tokens) / rate)}
+end
+
+if ARGV[4] == '1' then
+    tokens = tokens - 1
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil((capacity - tokens) / rate * 1000))
+end
+
+return {1, '0'}
+"""
+
+
+# Flag check, token bucket and sliding window in one step: the bucket
+# token and the window hit are taken only if the flag is '0' and both
+# limits allow. An unset flag is reported without consuming anything.
+# KEYS = flag key, bucket key, window key
+# ARGV = now, capacity, refill_per_second, limit, window_seconds,
+#        consume (0/1), member, flag override ('' for none)
+GUARDED_TAKE_LUA = """
+local now = tonumber(ARGV[1])
+local flag = redis.call('GET', KEYS[1])
+if not flag and ARGV[8] ~= '' then
+    flag = ARGV[8]
+end
+
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[2], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+end
+
+local limit = tonumber(ARGV[4])
+local window = tonumber(ARGV[5])
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[3])
+local allowed = count < limit
+
+if ARGV[6] == '1' and flag == '0' and wait == 0 and allowed then
+    tokens = tokens - 1
+    redis.call('HSET', KEYS[2], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[2], math.ceil((capacity - tokens) / rate * 1000))
+    redis.call('ZADD', KEYS[3], now, ARGV[7])
+    redis.call('PEXPIRE', KEYS[3], math.ceil(window * 1000))
+    count = count + 1
+end
+
+local reset = now + window
+local oldest = redis.call('ZRANGE', KEYS[3], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window
+end
+
+return {flag or '', tostring(wait), allowed and 1 or 0,
+        math.max(limit - count, 0), tostring(reset)}
+"""
+
+
+def sliding_window_hit(
+    key: str,
+    *,
+    limit: int,
+    window_seconds: float,
+    consume: bool = True
+) -> Tuple[bool, int, float]:
+    """
+    Check (and optionally record) a hit against a sliding window limit.
+
+    Args:
+        key: Cache key identifying the limited subject
+        limit: Maximum hits per window
+        window_seconds: Window length in seconds
+        consume: Record the hit when allowed; False only peeks
+
+    Returns:
+        Tuple of (allowed, remaining, reset_at) with reset_at as a Unix
+        timestamp
+    """
+    now = time.time()
+    client = cache_redis_client()
+
+    if client is None:
+        return _sliding_window_hit_fallback(
+            key, limit=limit, window_seconds=window_seconds,
+            consume=consume, now=now
+        )
+
+    allowed, remaining, reset_at = redis_script(client, SLIDING_WINDOW_LUA)(
+        keys=[cache.make_key(key)],
+        args=[now, window_seconds, limit, int(consume), uuid.uuid4().hex],
+        client=client
+    )
+    return bool(allowed), int(remaining), float(reset_at)
+
+
+def _sliding_window_hit_fallback(
+    key: str,
+    *,
+    limit: int,
+    window_seconds: float,
+    consume: bool,
+    now: float
+) -> Tuple[bool, int, float]:
+    """Non-atomic sliding_window_hit for cache backends without Lua."""
+    hits = [hit for hit in cache.get(key, []) if hit > now - window_seconds]
+    allowed = len(hits) < limit
+
+    if allowed and consume:
+        hits.append(now)
+        cache.set(key, hits, timeout=math.ceil(window_seconds))
+
+    reset_at = (hits[0] if hits else now) + window_seconds
+    return allowed, max(limit - len(hits), 0), reset_at
+
+
+def token_bucket_take(
+    key: str,
+    *,
+    capacity: int,
+    refill_per_second: float,
+    consume: bool = True
+) -> Tuple[bool, float]:
+    """
+    Take (or check for) a token from a lazily refilled token bucket.
+
+    Args:
+        key: Cache key identifying the bucket
+        capacity: Maximum tokens held
+        refill_per_second: Tokens added per second
+        consume: Take the token when available; False only peeks
+
+    Returns:
+        Tuple of (ok, wait_seconds) where wait_seconds is 0 when ok
+    """
+    now = time.time()
+    client = cache_redis_client()
+
+    if client is None:
+        return _token_bucket_take_fallback(
+            key, capacity=capacity, refill_per_second=refill_per_second,
+            consume=consume, now=now
+        )
+
+    ok, wait_seconds = redis_script(client, TOKEN_BUCKET_LUA)(
+        keys=[cache.make_key(key)],
+        args=[now, capacity, refill_per_second, int(consume)],
+        client=client
+    )
+    return bool(ok), float(wait_seconds)
+
+
+def _token_bucket_take_fallback(
+    key: str,
+    *,
+    capacity: int,
+    refill_per_second: float,
+    consume: bool,
+    now: float
+) -> Tuple[bool, float]:
+    """Non-atomic token_bucket_take for cache backends without Lua."""
+    tokens, ts = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + max(0, now - ts) * refill_per_second)
+
+    if tokens < 1:
+        return False, (1 - tokens) / refill_per_second
+
+    if consume:
+        tokens -= 1
+        cache.set(
+            key,
+            (tokens, now),
+            timeout=math.ceil((capacity - tokens) / refill_per_second)
+        )
+
+    return True, 0.0
+
+
+def guarded_take(
+    flag_key: str,
+    bucket_key: str,
+    window_key: str,
+    *,
+    capacity: int,
+    refill_per_second: float,
+    limit: int,
+    window_seconds: float,
+    consume: bool = True,
+    flag: Optional[int] = None
+) -> Tuple[Optional[int], float, bool, int, float]:
+    """
+    Check a 0/1 cache flag, a token bucket and a sliding window together.
+
+    One Redis round trip replaces token_bucket_take, sliding_window_hit
+    and a flag lookup. With consume=True the token and the window hit are
+    taken only when the flag is 0 and both limits allow, so a rejected
+    attempt uses up neither.
+
+    Args:
+        flag_key: Cache key of a 0/1 flag that blocks the attempt when 1
+        bucket_key: Cache key of the token bucket
+        window_key: Cache key of the sliding window
+        capacity: Maximum tokens held
+        refill_per_second: Tokens added per second
+        limit: Maximum hits per window
+        window_seconds: Window length in seconds
+        consume: Take the token and record the hit when allowed
+        flag: Flag value to use when the flag key is unset
+
+    Returns:
+        Tuple of (flag, wait_seconds, allowed, remaining, reset_at); flag
+        is None when unset and not overridden, in which case nothing was
+        consumed
+    """
+    now = time.time()
+    client = cache_redis_client()
+
+    if client is None:
+        return _guarded_take_fallback(
+            flag_key, bucket_key, window_key, capacity=capacity,
+            refill_per_second=refill_per_second, limit=limit,
+            window_seconds=window_seconds, consume=consume, flag=flag
+        )
+
+    raw_flag, wait_seconds, allowed, remaining, reset_at = redis_script(
+        client, GUARDED_TAKE_LUA
+    )(
+        keys=[cache.make_key(key) for key in (flag_key, bucket_key, window_key)],
+        args=[
+            now, capacity, refill_per_second, limit, window_seconds,
+            int(consume), uuid.uuid4().hex, '' if flag is None else int(flag)
+        ],
+        client=client
+    )
+    # Anything but a plain 0/1 (e.g. a value pickled by the cache) is
+    # treated as unset
+    raw_flag = raw_flag.decode() if isinstance(raw_flag, bytes) else raw_flag
+    return (
+        int(raw_flag) if raw_flag in ('0', '1') else None,
+        float(wait_seconds), bool(allowed), int(remaining), float(reset_at)
+    )
+
+
+def _guarded_take_fallback(
+    flag_key: str,
+    bucket_key: str,
+    window_key: str,
+    *,
+    capacity: int,
+    refill_per_second: float,
+    limit: int,
+    window_seconds: float,
+    consume: bool,
+    flag: Optional[int]
+) -> Tuple[Optional[int], float, bool, int, float]:
+    """Non-atomic guarded_take for cache backends without Lua."""
+    cached = cache.get(flag_key)
+    if cached is None:
+        cached = flag
+    cached = None if cached is None else int(cached)
+
+    _, wait_seconds = token_bucket_take(
+        bucket_key, capacity=capacity,
+        refill_per_second=refill_per_second, consume=False
+    )
+    allowed, remaining, reset_at = sliding_window_hit(
+        window_key, limit=limit, window_seconds=window_seconds, consume=False
+    )
+
+    if consume and cached == 0 and wait_seconds == 0 and allowed:
+        token_bucket_take(
+            bucket_key, capacity=capacity, refill_per_second=refill_per_second
+        )
+        _, remaining, reset_at = sliding_window_hit(
+            window_key, limit=limit, window_seconds=window_seconds
+        )
+
+    return cached, wait_seconds, allowed, remaining, reset_at
@@ -0,0 +1,14 @@
+"""
+Celery application for VoteFight project.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vote_fight.settings")
+
+app = Celery("vote_fight")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
+app.autodiscover_tasks(["tasks"], related_name="battle_tasks")
+app.autodiscover_tasks(["tasks"], related_name="user_tasks")
@@ -0,0 +1,35 @@
+"""
+Database routers for VoteFight project.
+"""
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+
+def read_replica_alias() -> str:
+    """
+    Alias for heavy read-only queries: the replica when configured,
+    otherwise the primary.
+    """
+    return REPLICA_ALIAS if REPLICA_ALIAS in settings.DATABASES else 'default'
+
+
+class ReplicaRouter:
+    """
+    Keep the replica out of writes and migrations.
+
+    Reads are not routed implicitly: services opt in with
+    ``.using(read_replica_alias())`` for queries that tolerate replication
+    lag, so read-your-writes paths (e.g. refresh_from_db after an UPDATE)
+    stay on the primary.
+    """
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
@@ -35,6 +35,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -292,10 +293,45 @@ VOTEFIGHT_SETTINGS = {
     'VOTE_COOLDOWN_SECONDS': 60,
     'RATE_LIMIT_WINDOW_SECONDS': 300,
     'MAX_VOTES_PER_WINDOW': 10,
+    'VOTE_POINTS': 1,  # Gamification points per vote
     'TRENDING_UPDATE_INTERVAL': 300,  # 5 minutes
+    'VIEW_FLUSH_INTERVAL': 60,  # 1 minute
+    'METRICS_RECONCILE_INTERVAL': 300,  # 5 minutes
+    'LAST_ACTIVE_FLUSH_INTERVAL': 60,  # 1 minute
+    'VOTE_BUFFER_ENABLED': False,  # Requires the Redis cache backend
+    'VOTE_BUFFER_FLUSH_INTERVAL': 1,  # seconds
+    'NOTIFICATION_FLUSH_INTERVAL': 1,  # seconds
     'MAX_FILE_SIZE': 50 * 1024 * 1024,  # 50MB
     'ALLOWED_IMAGE_TYPES': ['image/jpeg', 'image/png', 'image/webp'],
     'ALLOWED_VIDEO_TYPES': ['video/mp4', 'video/webm'],
     'ALLOWED_AUDIO_TYPES': ['audio/mpeg', 'audio/wav', 'audio/ogg'],
     'ALLOWED_DOCUMENT_TYPES': ['application/pdf', 'text/plain'],
 }
+
+# Periodic tasks
+CELERY_BEAT_SCHEDULE = {
+    'recompute-trending-scores': {
+        'task': 'tasks.battle_tasks.recompute_trending_scores',
+        'schedule': VOTEFIGHT_SETTINGS['TRENDING_UPDATE_INTERVAL'],
+    },
+    'reconcile-battle-metrics': {
+        'task': 'tasks.battle_tasks.reconcile_battle_metrics',
+        'schedule': VOTEFIGHT_SETTINGS['METRICS_RECONCILE_INTERVAL'],
+    },
+    'flush-view-counts': {
+        'task': 'tasks.battle_tasks.flush_view_counts',
+        'schedule': VOTEFIGHT_SETTINGS['VIEW_FLUSH_INTERVAL'],
+    },
+    'flush-last-active': {
+        'task': 'tasks.user_tasks.flush_last_active',
+        'schedule': VOTEFIGHT_SETTINGS['LAST_ACTIVE_FLUSH_INTERVAL'],
+    },
+    'flush-vote-buffer': {
+        'task': 'tasks.battle_tasks.flush_vote_buffer',
+        'schedule': VOTEFIGHT_SETTINGS['VOTE_BUFFER_FLUSH_INTERVAL'],
+    },
+    'flush-notifications': {
+        'task': 'tasks.user_tasks.flush_notifications',
+        'schedule': VOTEFIGHT_SETTINGS['NOTIFICATION_FLUSH_INTERVAL'],
+    },
+}
@@ -17,13 +17,9 @@ MIDDLEWARE += [
     'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
-# Database for development (SQLite for simplicity)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# Database for development: PostgreSQL from base settings (DJANGO_DATABASE_*
+# env vars, e.g. a local Docker container) for parity with production
+DATABASES['default']['CONN_MAX_AGE'] = 60
 
 # Debug Toolbar settings
 INTERNAL_IPS = [
@@ -38,10 +34,16 @@ CORS_ALLOW_CREDENTIALS = True
 # Email backend for development
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
-# Cache settings for development
+# Cache settings for development: Redis as in production, so Lua scripts,
+# pipelines and the cross-process counters behave the same locally
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': get_env_variable('REDIS_URL', 'redis://localhost:6379/1'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'CONNECTION_POOL_KWARGS': {'max_connections': 10},
+        }
     }
 }
 
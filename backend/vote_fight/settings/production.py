@@ -1,6 +1,8 @@
 """
 Production settings for VoteFight Django project.
 """
+import environ
+
 from .base import *
 
 # Security settings
@@ -22,12 +24,32 @@ DATABASES = {
         'PASSWORD': get_env_variable('DJANGO_DATABASE_PASSWORD'),
         'HOST': get_env_variable('DJANGO_DATABASE_HOST'),
         'PORT': get_env_variable('DJANGO_DATABASE_PORT', '5432'),
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        # PgBouncer in transaction pooling mode cannot keep server-side
+        # cursors open across transactions
+        'DISABLE_SERVER_SIDE_CURSORS': True,
         'OPTIONS': {
             'sslmode': 'require',
         },
     }
 }
 
+# Optional read replica for heavy read-only queries (statistics, history)
+DATABASE_READ_URL = get_env_variable('DJANGO_DATABASE_READ_URL', '')
+if DATABASE_READ_URL:
+    DATABASES['replica'] = {
+        **environ.Env.db_url_config(DATABASE_READ_URL),
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': True,
+        'OPTIONS': {
+            'sslmode': 'require',
+        },
+    }
+
+DATABASE_ROUTERS = ['vote_fight.db_routers.ReplicaRouter']
+
 # Static files for production
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -83,4 +105,5 @@ VOTEFIGHT_SETTINGS.update({
     'DISABLE_CSRF': False,
     'ENABLE_ANALYTICS': True,
     'ENABLE_MONITORING': True,
+    'VOTE_BUFFER_ENABLED': True,
 })